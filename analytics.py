@@ -0,0 +1,102 @@
+import numpy as np
+
+import network_metrics
+from binning import histogram_2d, integer_edges
+
+# Everything here is plain NumPy/pandas over the shared frames, filter indexes
+# and salary cube, so it can be timed, cached or run in parallel outside a
+# Streamlit run. The pages only turn the results into figures and widgets.
+
+SEMESTER_COLUMNS = {
+    1: ("Curricular units 1st sem (enrolled)", "Curricular units 1st sem (approved)"),
+    2: ("Curricular units 2nd sem (enrolled)", "Curricular units 2nd sem (approved)"),
+}
+
+
+def salary_filters(experience=(), years=(), remote=None):
+    """Cube/index filters for the gallery sidebar; empty selections mean "all"."""
+    return {
+        "experience_level": list(experience) or None,
+        "work_year": list(years) or None,
+        "remote_ratio": None if remote is None else [remote],
+    }
+
+
+def salary_box_stats(cube, filters):
+    """Box-plot quartiles and fences per experience level."""
+    return {
+        level: sketch.box_stats()
+        for level, sketch in cube.summarize_by(filters, "experience_level").items()
+    }
+
+
+def salary_histogram(cube, filters, nbins=40):
+    """Equal-width salary bins, their counts and the median of the filtered rows."""
+    sketch = cube.summarize(filters)
+    edges, counts = sketch.binned(nbins)
+    return edges, counts, sketch.median()
+
+
+def median_salary_by_year(cube, filters):
+    """Years with data and the median salary in each, as arrays."""
+    by_year = cube.summarize_by(filters, "work_year")
+    years = np.fromiter(by_year, dtype=np.int64, count=len(by_year))
+    medians = np.fromiter((sketch.median() for sketch in by_year.values()), dtype=np.float64, count=len(by_year))
+    return years, medians
+
+
+def remote_onsite_counts(cube, filters, year=2024):
+    """Fully on-site (0) and fully remote (100) role counts in ``year``, within ``filters``."""
+    years = [year] if filters.get("work_year") is None or year in filters["work_year"] else []
+    by_remote = cube.summarize_by({**filters, "work_year": years}, "remote_ratio")
+    ratios = np.array([ratio for ratio in by_remote if ratio in (0, 100)], dtype=np.int64)
+    counts = np.array([by_remote[ratio].count for ratio in ratios.tolist()], dtype=np.int64)
+    return ratios, counts
+
+
+def ages_in_range(ages, age_range):
+    """Ages within the slider's inclusive range, or ``None`` when the range covers all of them."""
+    ages = np.asarray(ages)
+    low, high = age_range
+    if len(ages) and low <= ages.min() and high >= ages.max():
+        return None
+    return ages[(ages >= low) & (ages <= high)].tolist()
+
+
+def student_filters(targets=(), ages=None):
+    return {
+        "Target": list(targets) or None,
+        "Age at enrollment": ages,
+    }
+
+
+def _column(frame, column, positions):
+    values = frame[column].to_numpy()
+    return values if positions is None else values[positions]
+
+
+def semester_progress(frame, index, filters, semester, nbins=10):
+    """2-D counts of units enrolled vs approved in a semester, over the filtered rows.
+
+    Unit counts are whole numbers, so the bins are too: at most ``nbins`` per
+    axis, each covering the same number of integer values.
+    """
+    enrolled, approved = SEMESTER_COLUMNS[semester]
+    positions = index.select(filters)
+    x, y = _column(frame, enrolled, positions), _column(frame, approved, positions)
+    return histogram_2d(x, y, nbinsx=integer_edges(x, nbins), nbinsy=integer_edges(y, nbins))
+
+
+def graph_metrics(G, k=None, key=None):
+    """Degree, betweenness, closeness and eigenvector centrality, most connected first."""
+    return network_metrics.centrality_metrics(G, k=k, key=key)
+
+
+def key_nodes(metrics):
+    """The most connected (highest degree) and most influential (highest betweenness) nodes.
+
+    Both are ``None`` for a graph without nodes.
+    """
+    if metrics.empty:
+        return None, None
+    return metrics["Degree"].idxmax(), metrics["Betweenness"].idxmax()
@@ -0,0 +1,91 @@
+"""Time the analytics kernels on their own, without Streamlit.
+
+Builds the same shared objects the pages use (typed frames, filter indexes,
+salary cube, first edge-list graph) and reports the median time of each function
+in analytics.py over a few representative filter states. Point
+``APP_DATA_DIR`` at a scaled copy from synthetic_data.py to time larger data.
+
+    python benchmarks/kernels.py --repeat 50
+"""
+import argparse
+import itertools
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+# Time the computations themselves, not reads from the shared result store.
+os.environ["APP_RESULT_STORE_MB"] = "0"
+
+import analytics  # noqa: E402
+import data_loader  # noqa: E402
+import edge_lists  # noqa: E402
+import salary_feed  # noqa: E402
+from filter_index import FilterIndex  # noqa: E402
+
+SALARY_FILTERS = {
+    "all": analytics.salary_filters(),
+    "senior 2024": analytics.salary_filters(["SE"], [2024]),
+    "remote mid/senior": analytics.salary_filters(["MI", "SE"], remote=100),
+}
+STUDENT_FILTERS = {
+    "all": analytics.student_filters(),
+    "dropouts": analytics.student_filters(["Dropout"]),
+    "dropouts 18-25": analytics.student_filters(["Dropout"], list(range(18, 26))),
+}
+
+
+def _median_ms(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    salaries = data_loader.load_dataset("developer-salary")
+    cube = salary_feed.update_cube()
+    students = data_loader.load_dataset("student-dropout-risk")
+    student_index = FilterIndex(students, ["Target", "Age at enrollment"])
+    graphs = edge_lists.available_edge_lists()
+
+    kernels = []
+    for name, filters in SALARY_FILTERS.items():
+        kernels += [
+            (f"salary_box_stats [{name}]", lambda f=filters: analytics.salary_box_stats(cube, f)),
+            (f"salary_histogram [{name}]", lambda f=filters: analytics.salary_histogram(cube, f)),
+            (f"median_salary_by_year [{name}]", lambda f=filters: analytics.median_salary_by_year(cube, f)),
+            (f"remote_onsite_counts [{name}]", lambda f=filters: analytics.remote_onsite_counts(cube, f)),
+        ]
+    for name, filters in STUDENT_FILTERS.items():
+        kernels.append((
+            f"semester_progress [{name}]",
+            lambda f=filters: analytics.semester_progress(students, student_index, f, semester=1),
+        ))
+    if graphs:
+        G = edge_lists.load_graph(graphs[0])
+        # A fresh cache key per call, so this times computing the metrics, not a lookup.
+        keys = itertools.count()
+        kernels.append((
+            f"graph_metrics [{graphs[0].name}]",
+            lambda: analytics.graph_metrics(G, key=f"kernels-{next(keys)}"),
+        ))
+
+    print(f"{len(salaries):,} salary rows, {len(students):,} student rows\n")
+    print(f"{'kernel':<48} {'median ms':>10}")
+    for name, func in kernels:
+        print(f"{name:<48} {_median_ms(func, args.repeat):>10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""Concurrent-session load test against a local ``streamlit run`` of the app.
+
+Starts the app on a free localhost port, then opens ``--sessions`` simulated
+browser sessions over Streamlit's websocket protocol (protobuf BackMsg /
+ForwardMsg on ``/_stcore/stream``). Each session opens the EDA Gallery or the
+Dashboard and replays that page's filter/theme interactions, waiting for the
+rerun to finish before the next one, like a user would. Interactions with
+widgets inside a fragment are sent as fragment reruns, as the browser does.
+
+Reports p50/p95/p99 rerun latency, throughput and the server's RSS over time
+(sampled from /proc, so RSS needs Linux), and writes everything as JSON.
+
+    python benchmarks/load_test.py --sessions 20 --interactions 30
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from websockets.asyncio.client import connect
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Widget label -> sequence of values each session cycles through. Values are
+# what the browser sends: option strings for select widgets, numbers for sliders.
+INTERACTIONS = {
+    "EDA_Gallery": [
+        ("Color theme", "Forest Green"),
+        ("Experience level", ["SE"]),
+        ("Work year", ["2024"]),
+        ("Remote ratio", "100"),
+        ("Experience level", ["SE", "MI"]),
+        ("Remote ratio", "All"),
+        ("Work year", []),
+        ("Experience level", []),
+        ("Color theme", "Ocean Blue"),
+    ],
+    "Dashboard": [
+        ("Color theme", "Sunset Warm"),
+        ("Outcome", ["Dropout"]),
+        ("Age at enrollment", [18.0, 30.0]),
+        ("Outcome", ["Dropout", "Graduate"]),
+        ("Age at enrollment", [20.0, 40.0]),
+        ("Outcome", []),
+        ("Color theme", "Ocean Blue"),
+    ],
+}
+RSS_INTERVAL = 0.5
+STARTUP_TIMEOUT = 60
+RERUN_TIMEOUT = 120
+WIDGET_TYPES = {"selectbox", "multiselect", "slider"}
+FINISHED = {
+    ForwardMsg.FINISHED_SUCCESSFULLY,
+    ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, env=None):
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", str(ROOT / "Bio.py"),
+            "--server.headless", "true",
+            "--server.address", "127.0.0.1",
+            "--server.port", str(port),
+            "--browser.gatherUsageStats", "false",
+        ],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"streamlit exited with status {server.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("streamlit did not become healthy in time")
+
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return None
+
+
+async def sample_rss(pid, samples, started, stop):
+    while not stop.is_set():
+        try:
+            samples.append((time.perf_counter() - started, rss_mb(pid)))
+        except OSError:
+            return
+        try:
+            await asyncio.wait_for(stop.wait(), RSS_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+class Session:
+    """One simulated browser tab: tracks widgets from deltas and sends reruns."""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.widgets = {}
+        self.states = {}
+
+    async def rerun(self, page_name, fragment_id=""):
+        message = BackMsg()
+        client_state = message.rerun_script
+        client_state.page_name = page_name
+        client_state.fragment_id = fragment_id
+        client_state.widget_states.widgets.extend(self.states.values())
+        started = time.perf_counter()
+        await self.websocket.send(message.SerializeToString())
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await asyncio.wait_for(self.websocket.recv(), RERUN_TIMEOUT))
+            kind = msg.WhichOneof("type")
+            if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                self._track(msg.delta)
+            elif kind == "script_finished":
+                if msg.script_finished in FINISHED:
+                    return time.perf_counter() - started
+                if msg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError(f"{page_name} failed to compile")
+
+    def _track(self, delta):
+        element = delta.new_element
+        widget_type = element.WhichOneof("type")
+        if widget_type in WIDGET_TYPES:
+            widget = getattr(element, widget_type)
+            self.widgets[widget.label] = (widget_type, widget.id, delta.fragment_id)
+
+    def set_widget(self, label, value):
+        """Record a new widget value; returns the fragment the widget belongs to."""
+        widget_type, widget_id, fragment_id = self.widgets[label]
+        state = self.states.get(widget_id) or BackMsg().rerun_script.widget_states.widgets.add()
+        state.Clear()
+        state.id = widget_id
+        if widget_type == "selectbox":
+            state.string_value = value
+        elif widget_type == "multiselect":
+            state.string_array_value.data[:] = value
+        else:
+            state.double_array_value.data[:] = value
+        self.states[widget_id] = state
+        return fragment_id
+
+
+async def run_session(url, page_name, interactions, offset, think_time, latencies, errors):
+    try:
+        async with connect(url, subprotocols=["streamlit"], max_size=None, compression=None) as websocket:
+            session = Session(websocket)
+            latencies.append(("open", page_name, await session.rerun(page_name)))
+            steps = INTERACTIONS[page_name]
+            for step in range(interactions):
+                label, value = steps[(offset + step) % len(steps)]
+                fragment_id = session.set_widget(label, value)
+                latencies.append((label, page_name, await session.rerun(page_name, fragment_id)))
+                await asyncio.sleep(random.uniform(0, think_time))
+    except Exception as e:
+        errors.append(f"{page_name} session {offset}: {type(e).__name__}: {e}")
+
+
+def _percentiles(values):
+    if not values:
+        return None
+    p50, p95, p99 = np.percentile(np.array(values) * 1000, [50, 95, 99])
+    return {"count": len(values), "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "max_ms": max(values) * 1000}
+
+
+async def load_test(port, pid, sessions, interactions, think_time, pages, seed):
+    random.seed(seed)
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    latencies, errors, rss = [], [], []
+    stop = asyncio.Event()
+    started = time.perf_counter()
+    sampler = asyncio.create_task(sample_rss(pid, rss, started, stop))
+    await asyncio.gather(*(
+        run_session(url, pages[i % len(pages)], interactions, i, think_time, latencies, errors)
+        for i in range(sessions)
+    ))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await sampler
+
+    reruns = [seconds for _, _, seconds in latencies]
+    return {
+        "sessions": sessions,
+        "interactions_per_session": interactions,
+        "think_time_s": think_time,
+        "elapsed_s": elapsed,
+        "throughput_reruns_per_s": len(reruns) / elapsed if elapsed else None,
+        "latency": _percentiles(reruns),
+        "latency_by_page": {
+            page: _percentiles([seconds for _, name, seconds in latencies if name == page])
+            for page in pages
+        },
+        "page_open": _percentiles([seconds for kind, _, seconds in latencies if kind == "open"]),
+        "rss_mb": {
+            "start": rss[0][1] if rss else None,
+            "peak": max(value for _, value in rss) if rss else None,
+            "end": rss[-1][1] if rss else None,
+            "timeline": [{"t": round(t, 2), "mb": round(value, 1)} for t, value in rss],
+        },
+        "errors": errors,
+    }
+
+
+def _report(result):
+    print(f"\n{result['sessions']} sessions x {result['interactions_per_session']} interactions "
+          f"in {result['elapsed_s']:.1f}s ({result['throughput_reruns_per_s']:.1f} reruns/s)")
+    rows = [("all reruns", result["latency"]), ("page open", result["page_open"])]
+    rows += [(page, stats) for page, stats in result["latency_by_page"].items()]
+    print(f"{'':<14} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, stats in rows:
+        if stats:
+            print(f"{name:<14} {stats['count']:>6} {stats['p50_ms']:>8.0f} {stats['p95_ms']:>8.0f} "
+                  f"{stats['p99_ms']:>8.0f} {stats['max_ms']:>8.0f}")
+    rss = result["rss_mb"]
+    if rss["peak"] is not None:
+        print(f"server RSS: {rss['start']:.0f} MB at start, {rss['peak']:.0f} MB peak, {rss['end']:.0f} MB at end")
+    for error in result["errors"]:
+        print(f"error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--interactions", type=int, default=20, help="Widget changes per session.")
+    parser.add_argument("--think-time", type=float, default=0.2, help="Max random pause between interactions (s).")
+    parser.add_argument("--pages", nargs="+", default=list(INTERACTIONS), choices=list(INTERACTIONS))
+    parser.add_argument("--port", type=int, help="Defaults to a free port.")
+    parser.add_argument("--data-dir", type=Path, help="Run the app against another data directory (APP_DATA_DIR).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    port = args.port or _free_port()
+    env = dict(os.environ)
+    if args.data_dir:
+        env["APP_DATA_DIR"] = str(args.data_dir.resolve())
+    server = start_server(port, env)
+    try:
+        result = asyncio.run(load_test(
+            port, server.pid, args.sessions, args.interactions, args.think_time, args.pages, args.seed
+        ))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    _report(result)
+    output = args.output or RESULTS_DIR / f"load-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"\nResults written to {output}")
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Per-dataset memory footprint: default ``read_csv`` dtypes against the app's typed frames.
+
+Loads every dataset the way the pages do (including the shared filter indexes
+and the salary cube) and prints what each object holds in this process, next
+to what the same CSV takes with pandas' default dtypes.
+
+    python benchmarks/memory_report.py
+    python benchmarks/memory_report.py --columns   # per-column breakdown
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import data_loader  # noqa: E402
+import salary_feed  # noqa: E402
+from filter_index import FilterIndex  # noqa: E402
+
+# The derived objects the pages build on top of each dataset.
+DERIVED = {
+    "developer-salary": {
+        "filter_index": lambda frame: FilterIndex(frame, ["experience_level", "work_year", "remote_ratio"]),
+    },
+    "student-dropout-risk": {
+        "filter_index": lambda frame: FilterIndex(frame, ["Target", "Age at enrollment"]),
+    },
+}
+# Aggregates kept current from the file itself rather than from the frame.
+STREAMED = {
+    "developer-salary": {
+        "salary_cube": salary_feed.update_cube,
+    },
+}
+
+
+def _mb(n_bytes):
+    return f"{n_bytes / 1024 / 1024:>9.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--columns", action="store_true", help="Also list every column.")
+    args = parser.parse_args()
+
+    for name, spec in data_loader.DATASETS.items():
+        default = pd.read_csv(data_loader.dataset_path(name), **spec["read_csv"])
+        default = default.rename(columns=data_loader.clean_column_name)
+        frame = data_loader.load_dataset(name)
+        for key, build in DERIVED.get(name, {}).items():
+            data_loader.load_derived(name, key, build)
+        for key, build in STREAMED.get(name, {}).items():
+            data_loader.load_streamed(name, key, build)
+
+        before = default.memory_usage(deep=True, index=False)
+        after = frame.memory_usage(deep=True, index=False)
+        print(f"\n{name}: {len(frame):,} rows")
+        print(f"  {'default dtypes':<40} {_mb(before.sum())} MB")
+        print(f"  {'typed frame':<40} {_mb(after.sum())} MB")
+        if args.columns:
+            for col in frame.columns:
+                print(f"    {col:<46} {str(default[col].dtype):>8} -> {str(frame[col].dtype):<8} "
+                      f"{before[col] / 1024:>8.1f} -> {after[col] / 1024:>8.1f} KB")
+        for row in data_loader.memory_footprint():
+            if row["dataset"] == name and not row["object"].startswith("frame"):
+                print(f"  {row['object']:<40} {_mb(row['bytes'])} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""Headless benchmarks for every page, driven through Streamlit's AppTest harness.
+
+For each scale, the files in data/ are copied scaled up (see synthetic_data.py),
+then every page runs in a fresh process pointed at them:
+
+* cold: the first run in a new process, with the Parquet cache already on disk
+  (i.e. a server restart);
+* warm: the median of further reruns with no widget changes;
+* one timing per scripted interaction from scenarios.py;
+* the process's peak RSS.
+
+Each scale also records how long ingesting the scaled CSVs took and how much
+memory the typed frames hold. Results are written as JSON; pass
+``--baseline`` with an earlier results file to flag regressions (non-zero
+exit status when any are found).
+
+    python benchmarks/run_benchmarks.py --scales 1 10
+    python benchmarks/run_benchmarks.py --baseline benchmarks/results/<earlier>.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+WORK_DIR = ROOT / ".cache" / "benchmarks"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+SCALES = (1, 10, 100)
+WARM_RUNS = 3
+TIMEOUT = 900
+# A metric regresses when it grows by more than this fraction and by more than
+# the absolute floor, so sub-millisecond noise on fast pages is not flagged.
+REGRESSION_THRESHOLD = 0.25
+REGRESSION_FLOOR = {"ms": 5.0, "mb": 10.0}
+
+
+def pages():
+    return ["Bio.py"] + sorted(str(path.relative_to(ROOT)) for path in (ROOT / "pages").glob("*.py"))
+
+
+def _elapsed_ms(run):
+    start = time.perf_counter()
+    run()
+    return (time.perf_counter() - start) * 1000
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure_page(page):
+    """Cold, warm and per-interaction rerun times for one page, in this process."""
+    sys.path.insert(0, str(ROOT))
+    from streamlit.testing.v1 import AppTest
+    from scenarios import SCENARIOS
+
+    at = AppTest.from_file(str(ROOT / "Bio.py"), default_timeout=TIMEOUT)
+    if page != "Bio.py":
+        at.switch_page(page)
+    cold_ms = _elapsed_ms(at.run)
+    warm_ms = [_elapsed_ms(at.run) for _ in range(WARM_RUNS)]
+
+    interactions = {}
+    for name, action in SCENARIOS.get(page, []):
+        try:
+            action(at)
+        except StopIteration:
+            interactions[name] = None
+            continue
+        interactions[name] = _elapsed_ms(at.run)
+
+    return {
+        "page": page,
+        "cold_ms": cold_ms,
+        "warm_ms": statistics.median(warm_ms),
+        "interactions_ms": interactions,
+        "peak_rss_mb": _peak_rss_mb(),
+        "errors": [exception.value for exception in at.exception],
+    }
+
+
+def measure_ingest():
+    """Seconds to turn each scaled CSV into its Parquet cache (and stream the salary aggregates)."""
+    sys.path.insert(0, str(ROOT))
+    import data_loader
+
+    ingest = {}
+    for name in data_loader.DATASETS:
+        start = time.perf_counter()
+        frame = data_loader.load_dataset(name)
+        ingest[name] = {
+            "seconds": time.perf_counter() - start,
+            "rows": len(frame),
+            "memory_mb": data_loader.nbytes(frame) / 1024 / 1024,
+        }
+    import salary_feed
+
+    start = time.perf_counter()
+    cube = salary_feed.update_cube()
+    ingest["salary-aggregates"] = {"seconds": time.perf_counter() - start, "rows": int(cube.counts.sum())}
+    return ingest
+
+
+def _in_subprocess(args, env):
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as output:
+        path = Path(output.name)
+    try:
+        worker = subprocess.run(
+            [sys.executable, __file__, *args, "--output", str(path)],
+            env=env,
+            cwd=ROOT,
+            timeout=TIMEOUT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        if worker.returncode:
+            raise RuntimeError(f"benchmark worker {args} failed:\n{worker.stderr[-4000:]}")
+        return json.loads(path.read_text())
+    finally:
+        path.unlink(missing_ok=True)
+
+
+def run_scale(scale, page_list):
+    from synthetic_data import scaled_data_dir
+
+    data_dir = scaled_data_dir(scale, WORK_DIR)
+    cache_dir = WORK_DIR / f"scale-{scale}" / "cache"
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    env = {**os.environ, "APP_DATA_DIR": str(data_dir), "APP_CACHE_DIR": str(cache_dir)}
+    env.pop("APP_TIMINGS_LOG", None)
+
+    print(f"scale {scale}x: ingesting", flush=True)
+    ingest = _in_subprocess(["--ingest"], env)
+    results = []
+    for page in page_list:
+        print(f"scale {scale}x: {page}", flush=True)
+        result = _in_subprocess(["--page", page], env)
+        result["scale"] = scale
+        results.append(result)
+    return ingest, results
+
+
+def _metrics(result):
+    yield "cold_ms", result["cold_ms"]
+    yield "warm_ms", result["warm_ms"]
+    for name, value in result["interactions_ms"].items():
+        yield f"{name}_ms", value
+    yield "peak_rss_mb", result["peak_rss_mb"]
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """Metrics in ``current`` that are slower/larger than in ``baseline`` beyond the threshold."""
+    before = {
+        (result["scale"], result["page"], metric): value
+        for result in baseline["results"]
+        for metric, value in _metrics(result)
+    }
+    regressions = []
+    for result in current["results"]:
+        for metric, value in _metrics(result):
+            old = before.get((result["scale"], result["page"], metric))
+            if old is None or value is None:
+                continue
+            floor = REGRESSION_FLOOR[metric.rsplit("_", 1)[1]]
+            if value > old * (1 + threshold) and value - old > floor:
+                regressions.append({
+                    "scale": result["scale"],
+                    "page": result["page"],
+                    "metric": metric,
+                    "baseline": old,
+                    "current": value,
+                })
+    return regressions
+
+
+def _report(results):
+    print(f"\n{'scale':>5}  {'page':<34} {'cold ms':>9} {'warm ms':>9} {'slowest interaction':>26} {'peak MB':>8}")
+    for result in results:
+        timed = {name: ms for name, ms in result["interactions_ms"].items() if ms is not None}
+        slowest = max(timed, key=timed.get) if timed else None
+        slowest = f"{slowest} {timed[slowest]:.0f}" if slowest else "-"
+        print(
+            f"{result['scale']:>4}x  {result['page']:<34} {result['cold_ms']:>9.0f} "
+            f"{result['warm_ms']:>9.0f} {slowest:>26} {result['peak_rss_mb']:>8.0f}"
+        )
+        for error in result["errors"]:
+            print(f"       error: {error.splitlines()[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=list(SCALES))
+    parser.add_argument("--pages", nargs="+", help="Limit to these pages (paths relative to the repo root).")
+    parser.add_argument("--baseline", type=Path, help="Earlier results file to compare against.")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--page", help=argparse.SUPPRESS)
+    parser.add_argument("--ingest", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Worker modes: measure inside this (fresh) process and hand back JSON.
+    if args.page or args.ingest:
+        result = measure_page(args.page) if args.page else measure_ingest()
+        args.output.write_text(json.dumps(result))
+        return 0
+
+    import streamlit
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "ingest": {},
+        "results": [],
+    }
+    for scale in args.scales:
+        ingest, results = run_scale(scale, args.pages or pages())
+        report["ingest"][str(scale)] = ingest
+        report["results"].extend(results)
+
+    _report(report["results"])
+
+    output = args.output or RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    if args.baseline:
+        report["baseline"] = str(args.baseline)
+        report["regressions"] = compare(json.loads(args.baseline.read_text()), report, args.threshold)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        for regression in report["regressions"]:
+            print(
+                f"REGRESSION {regression['scale']}x {regression['page']} {regression['metric']}: "
+                f"{regression['baseline']:.1f} -> {regression['current']:.1f}"
+            )
+        if report["regressions"]:
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
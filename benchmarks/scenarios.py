@@ -0,0 +1,48 @@
+"""Scripted widget interactions replayed on each page, in order, after the warm reruns."""
+
+
+def _widget(widgets, label):
+    return next(widget for widget in widgets if widget.label == label)
+
+
+def _select(label, value):
+    return lambda at: _widget(at.selectbox, label).select(value)
+
+
+def _multiselect(label, value):
+    return lambda at: _widget(at.multiselect, label).select(value)
+
+
+def _unselect(label, value):
+    return lambda at: _widget(at.multiselect, label).unselect(value)
+
+
+def _slide(label, value):
+    return lambda at: _widget(at.slider, label).set_value(value)
+
+
+def _toggle(label, value):
+    return lambda at: _widget(at.toggle, label).set_value(value)
+
+
+SCENARIOS = {
+    "pages/1_EDA_Gallery.py": [
+        ("theme", _select("Color theme", "Forest Green")),
+        ("experience", _multiselect("Experience level", "SE")),
+        ("year", _multiselect("Work year", 2024)),
+        ("remote", _select("Remote ratio", "100")),
+        ("clear experience", _unselect("Experience level", "SE")),
+        ("theme back", _select("Color theme", "Ocean Blue")),
+    ],
+    "pages/2_Dashboard.py": [
+        ("theme", _select("Color theme", "Sunset Warm")),
+        ("outcome", _multiselect("Outcome", "Dropout")),
+        ("age", _slide("Age at enrollment", (18, 30))),
+        ("clear outcome", _unselect("Outcome", "Dropout")),
+        ("theme back", _select("Color theme", "Ocean Blue")),
+    ],
+    "pages/4_Network_Exploration.py": [
+        ("community engine", _select("Community algorithm", "Louvain")),
+        ("approximate betweenness", _toggle("Approximate betweenness", True)),
+    ],
+}
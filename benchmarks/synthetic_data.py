@@ -0,0 +1,73 @@
+"""Scaled copies of the files in data/ for benchmarking."""
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from data_loader import DATA_DIR, DATASETS, file_version  # noqa: E402
+from edge_lists import available_edge_lists  # noqa: E402
+
+
+def scale_dataset(name, scale, out_dir):
+    """Repeat every row of a dataset's CSV ``scale`` times, keeping its text as-is."""
+    spec = DATASETS[name]
+    source = DATA_DIR / spec["file"]
+    target = out_dir / spec["file"]
+    if scale == 1:
+        shutil.copyfile(source, target)
+        return target
+    frame = pd.read_csv(source, dtype=str, keep_default_na=False, **spec["read_csv"])
+    frame = pd.concat([frame] * scale, ignore_index=True)
+    frame.to_csv(target, index=False, sep=spec["read_csv"].get("sep", ","))
+    return target
+
+
+def scale_edge_list(path, scale, out_dir):
+    """``scale`` disjoint copies of a graph, chained into one component by a bridge edge each."""
+    target = out_dir / path.name
+    if scale == 1:
+        shutil.copyfile(path, target)
+        return target
+    sep = "\t" if path.name.endswith(".tsv") else ","
+    edges = pd.read_csv(path, sep=sep, dtype=str)
+    source, dest = edges.columns[:2]
+    copies = []
+    for copy in range(scale):
+        renamed = edges.copy()
+        if copy:
+            renamed[source] = renamed[source] + f"~{copy}"
+            renamed[dest] = renamed[dest] + f"~{copy}"
+        copies.append(renamed)
+    anchor = edges[source].iloc[0]
+    bridges = pd.DataFrame({
+        source: [anchor if copy == 1 else f"{anchor}~{copy - 1}" for copy in range(1, scale)],
+        dest: [f"{anchor}~{copy}" for copy in range(1, scale)],
+    })
+    pd.concat(copies + [bridges], ignore_index=True).to_csv(target, index=False, sep=sep)
+    return target
+
+
+def scaled_data_dir(scale, work_dir):
+    """A data directory with every dataset and edge list scaled ``scale`` times.
+
+    Files are regenerated only when the originals in data/ change.
+    """
+    out_dir = work_dir / f"scale-{scale}" / "data"
+    sources = [DATA_DIR / spec["file"] for spec in DATASETS.values()] + available_edge_lists()
+    stamp = out_dir / "sources.json"
+    versions = [list(file_version(path)) for path in sources]
+    if stamp.exists() and json.loads(stamp.read_text()) == versions:
+        return out_dir
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name in DATASETS:
+        scale_dataset(name, scale, out_dir)
+    for path in available_edge_lists():
+        scale_edge_list(path, scale, out_dir)
+    stamp.write_text(json.dumps(versions))
+    return out_dir
@@ -0,0 +1,70 @@
+import numpy as np
+import plotly.graph_objects as go
+
+
+def _values(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values[np.isfinite(values)]
+
+
+def integer_edges(values, nbins):
+    """Edges of at most ``nbins`` bins over integer ``values``, each spanning the same whole numbers.
+
+    Edges sit halfway between integers, so no value falls on one and a bin
+    one value wide is centred on that value.
+    """
+    values = _values(values)
+    if not len(values):
+        return np.array([-0.5, 0.5])
+    low, high = int(values.min()), int(values.max())
+    step = -(-(high - low + 1) // nbins)
+    n_bins = -(-(high - low + 1) // step)
+    return low - 0.5 + step * np.arange(n_bins + 1)
+
+
+def histogram_2d(x, y, nbinsx, nbinsy):
+    """2-D counts; ``nbinsx``/``nbinsy`` are bin counts or explicit edges, as for np.histogram2d."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = np.isfinite(x) & np.isfinite(y)
+    counts, x_edges, y_edges = np.histogram2d(x[keep], y[keep], bins=(nbinsx, nbinsy))
+    return x_edges, y_edges, counts
+
+
+def bar_trace(edges, counts, color, name="Count"):
+    """A bar trace holding one bar per bin, so only the bin counts reach the browser."""
+    centers = (edges[:-1] + edges[1:]) / 2
+    return go.Bar(
+        x=centers,
+        y=counts,
+        width=np.diff(edges),
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        marker_color=color,
+        name=name,
+    )
+
+
+def heatmap_trace(x_edges, y_edges, counts, colorscale):
+    return go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        # histogram2d indexes counts as [x, y]; heatmaps expect rows of y.
+        z=counts.T,
+        colorscale=colorscale,
+        colorbar_title="count",
+    )
+
+
+def box_trace(stats, color):
+    """A box trace drawn from precomputed quartiles/fences: a few numbers per group, no raw rows."""
+    groups = list(stats)
+    return go.Box(
+        x=groups,
+        q1=[stats[group]["q1"] for group in groups],
+        median=[stats[group]["median"] for group in groups],
+        q3=[stats[group]["q3"] for group in groups],
+        lowerfence=[stats[group]["lowerfence"] for group in groups],
+        upperfence=[stats[group]["upperfence"] for group in groups],
+        boxpoints=False,
+        marker_color=color,
+    )
@@ -0,0 +1,70 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+import figure_cache
+import instrumentation
+
+# Threads shared by every session for building a page's charts side by side;
+# 1 builds them one after another on the script thread.
+CHART_WORKERS = int(os.environ.get("APP_CHART_WORKERS", min(8, os.cpu_count() or 1)))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ChartUnit:
+    """One chart on a page and the state it depends on.
+
+    ``build`` receives the page's data and only the filters named in
+    ``depends_on``, and returns an unthemed figure, which is cached on exactly
+    those filters and the data version. ``style`` then
+    applies the color theme in place, so a theme change re-styles a cached
+    figure and a filter change only rebuilds the charts that read it.
+    """
+
+    chart: str
+    depends_on: tuple
+    build: Callable
+    style: Callable
+
+    def figure(self, page, data, filters, theme, version=None):
+        consumed = {name: filters[name] for name in self.depends_on}
+        fig = figure_cache.cached_figure(
+            page, self.chart, consumed, None, version, lambda: self.build(data, consumed)
+        )
+        with instrumentation.stage("style"):
+            self.style(fig, theme)
+        return fig
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=CHART_WORKERS, thread_name_prefix="charts")
+    return _executor
+
+
+def build_figures(units, page, data, filters, theme, version=None):
+    """Figures for ``units`` keyed by chart, built concurrently on the shared pool.
+
+    Each chart is timed as a ``chart <name>`` stage. Those stages join the
+    page's run in the order of ``units`` once every figure is ready, so the
+    page can then render them in layout order.
+    """
+    def build(unit):
+        with instrumentation.stage(f"chart {unit.chart}"):
+            return unit.figure(page, data, filters, theme, version)
+
+    if CHART_WORKERS <= 1 or len(units) < 2:
+        return {unit.chart: build(unit) for unit in units}
+    futures = [_pool().submit(instrumentation.detached(build), unit) for unit in units]
+    figures = {}
+    for unit, future in zip(units, futures):
+        figures[unit.chart], stages = future.result()
+        instrumentation.adopt(stages)
+    return figures
@@ -0,0 +1,74 @@
+from functools import cache
+
+import networkx as nx
+from networkx.algorithms.community import (
+    greedy_modularity_communities,
+    label_propagation_communities,
+    louvain_communities,
+)
+
+
+def _leiden(G, seed):
+    return nx.community.leiden_communities(G, seed=seed)
+
+
+ENGINES = {
+    "Greedy modularity": lambda G, seed: greedy_modularity_communities(G),
+    "Louvain": lambda G, seed: louvain_communities(G, seed=seed),
+    "Label propagation": lambda G, seed: label_propagation_communities(G),
+    # Only offered when an installed NetworkX backend implements it.
+    "Leiden": _leiden,
+}
+DEFAULT_ENGINE = "Greedy modularity"
+
+
+@cache
+def available_engines():
+    probe = nx.path_graph(3)
+    engines = []
+    for name, engine in ENGINES.items():
+        try:
+            engine(probe, 0)
+        except (NotImplementedError, AttributeError):
+            continue
+        engines.append(name)
+    return engines
+
+
+def detect(G, engine=DEFAULT_ENGINE, seed=42):
+    """Communities of ``G`` as frozensets, largest first."""
+    if G.number_of_nodes() == 0:
+        return []
+    found = ENGINES[engine](G, seed)
+    return sorted((frozenset(c) for c in found), key=len, reverse=True)
+
+
+def update(G, previous, added_edges=(), removed_edges=(), engine=DEFAULT_ENGINE, seed=42):
+    """Re-detect only the communities touched by edge changes.
+
+    Communities containing an endpoint of an added/removed edge (plus any new
+    nodes) are dissolved and re-detected on their induced subgraph; every
+    other community is kept as-is, minus nodes no longer in ``G``.
+    """
+    node_to_comm = {node: i for i, comm in enumerate(previous) for node in comm}
+    touched = set()
+    new_nodes = set()
+    for u, v in list(added_edges) + list(removed_edges):
+        for node in (u, v):
+            if node in node_to_comm:
+                touched.add(node_to_comm[node])
+            else:
+                new_nodes.add(node)
+    new_nodes |= {node for node in G if node not in node_to_comm}
+
+    kept = []
+    affected = set(new_nodes)
+    for i, comm in enumerate(previous):
+        if i in touched:
+            affected |= comm
+        else:
+            kept.append(frozenset(node for node in comm if node in G))
+    affected = [node for node in affected if node in G]
+
+    redetected = detect(G.subgraph(affected), engine, seed)
+    return sorted((c for c in kept + redetected if c), key=len, reverse=True)
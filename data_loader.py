@@ -0,0 +1,424 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Pages share one parsed frame per dataset; copy-on-write keeps the shallow
+# copies we hand out from ever mutating the shared snapshot.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Both can be pointed elsewhere, e.g. at the scaled copies the benchmarks generate.
+DATA_DIR = Path(os.environ.get("APP_DATA_DIR", Path(__file__).parent / "data"))
+CACHE_ROOT = Path(os.environ.get("APP_CACHE_DIR", Path(__file__).parent / ".cache"))
+CACHE_DIR = CACHE_ROOT / "datasets"
+# Seconds between checks of the data files by the background watcher; 0 turns
+# it off, and every load then checks the file itself.
+WATCH_INTERVAL = float(os.environ.get("APP_WATCH_INTERVAL", 2))
+
+# Explicit column types for each CSV. Low-cardinality text becomes categorical
+# and small code/count columns get narrow integer types.
+SALARY_SCHEMA = {
+    "work_year": "int16",
+    "experience_level": "category",
+    "employment_type": "category",
+    "job_title": "category",
+    "salary": "int64",
+    "salary_currency": "category",
+    "salary_in_usd": "int32",
+    "employee_residence": "category",
+    "remote_ratio": "int8",
+    "company_location": "category",
+    "company_size": "category",
+}
+
+DROPOUT_SCHEMA = {
+    "Marital status": "int8",
+    "Application mode": "int8",
+    "Application order": "int8",
+    "Course": "int16",
+    "Daytime/evening attendance": "int8",
+    "Previous qualification": "int8",
+    "Previous qualification (grade)": "float64",
+    "Nacionality": "int8",
+    "Mother's qualification": "int8",
+    "Father's qualification": "int8",
+    "Mother's occupation": "int16",
+    "Father's occupation": "int16",
+    "Admission grade": "float64",
+    "Displaced": "int8",
+    "Educational special needs": "int8",
+    "Debtor": "int8",
+    "Tuition fees up to date": "int8",
+    "Gender": "int8",
+    "Scholarship holder": "int8",
+    "Age at enrollment": "int8",
+    "International": "int8",
+    "Curricular units 1st sem (credited)": "int8",
+    "Curricular units 1st sem (enrolled)": "int8",
+    "Curricular units 1st sem (evaluations)": "int8",
+    "Curricular units 1st sem (approved)": "int8",
+    "Curricular units 1st sem (grade)": "float64",
+    "Curricular units 1st sem (without evaluations)": "int8",
+    "Curricular units 2nd sem (credited)": "int8",
+    "Curricular units 2nd sem (enrolled)": "int8",
+    "Curricular units 2nd sem (evaluations)": "int8",
+    "Curricular units 2nd sem (approved)": "int8",
+    "Curricular units 2nd sem (grade)": "float64",
+    "Curricular units 2nd sem (without evaluations)": "int8",
+    "Unemployment rate": "float64",
+    "Inflation rate": "float64",
+    "GDP": "float64",
+    "Target": "category",
+}
+
+DATASETS = {
+    "developer-salary": {
+        "file": "developer-salary.csv",
+        "read_csv": {},
+        "schema": SALARY_SCHEMA,
+    },
+    "student-dropout-risk": {
+        "file": "student-dropout-risk.csv",
+        "read_csv": {"sep": ";"},
+        "schema": DROPOUT_SCHEMA,
+    },
+}
+
+_SOURCE_KEY = b"source_version"
+
+_snapshots = {}
+_derived = {}
+_builders = {}
+_streams = {}
+_reload_errors = {}
+_locks = {name: threading.Lock() for name in DATASETS}
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def clean_column_name(column):
+    """Strip byte-order marks and stray whitespace (e.g. trailing tabs) from a header."""
+    return column.replace("\ufeff", "").strip()
+
+
+def dataset_path(name):
+    return DATA_DIR / DATASETS[name]["file"]
+
+
+def file_version(path):
+    """Cache key for a data file: path + modification time + size."""
+    stat = Path(path).stat()
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def cache_path(name):
+    return CACHE_DIR / f"{name}.parquet"
+
+
+def normalize(name, frame):
+    """Clean headers and coerce every column to its declared type, failing loudly on bad data."""
+    spec = DATASETS[name]
+    frame = frame.rename(columns=clean_column_name)
+
+    missing = [col for col in spec["schema"] if col not in frame.columns]
+    if missing:
+        raise ValueError(f"{spec['file']} is missing expected columns: {', '.join(missing)}")
+
+    columns = {}
+    for col, dtype in spec["schema"].items():
+        values = frame[col]
+        dtype = pd.api.types.pandas_dtype(dtype)
+        if pd.api.types.is_integer_dtype(dtype):
+            if not pd.api.types.is_integer_dtype(values):
+                raise ValueError(f"{spec['file']}: column '{col}' should hold integers, found {values.dtype}")
+            bounds = np.iinfo(dtype)
+            if len(values) and (values.min() < bounds.min or values.max() > bounds.max):
+                raise ValueError(f"{spec['file']}: column '{col}' has values outside the {dtype} range")
+        elif pd.api.types.is_float_dtype(dtype) and not pd.api.types.is_numeric_dtype(values):
+            raise ValueError(f"{spec['file']}: column '{col}' should be numeric, found {values.dtype}")
+        columns[col] = values.astype(dtype)
+
+    return pd.DataFrame(columns)
+
+
+def _ingest(name, path, version):
+    """Parse the CSV, normalize it against its schema and write it to the Parquet cache."""
+    spec = DATASETS[name]
+    frame = normalize(name, pd.read_csv(path, **spec["read_csv"]))
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_SOURCE_KEY] = json.dumps(version[1:]).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    target = cache_path(name)
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        pq.write_table(table, tmp)
+        os.replace(tmp, target)
+    except OSError:
+        # A read-only checkout still works, it just re-parses the CSV.
+        pass
+
+    return frame
+
+
+def _read(name, path, version, columns):
+    target = cache_path(name)
+    try:
+        metadata = pq.read_schema(target).metadata or {}
+        if json.loads(metadata.get(_SOURCE_KEY, b"null")) == list(version[1:]):
+            return pq.read_table(target, columns=columns).to_pandas()
+    except (OSError, pa.ArrowInvalid, ValueError):
+        pass
+    frame = _ingest(name, path, version)
+    return frame[columns] if columns is not None else frame
+
+
+def _snapshot(name, columns):
+    spec = DATASETS[name]
+    if columns is not None:
+        columns = list(columns)
+        unknown = [col for col in columns if col not in spec["schema"]]
+        if unknown:
+            raise KeyError(f"{spec['file']} has no columns named: {', '.join(unknown)}")
+    key = (name, tuple(columns) if columns is not None else None)
+
+    # With the watcher running, a loaded snapshot is served as is: new file
+    # versions are read and swapped in by the watcher thread.
+    if _watching():
+        snapshot = _snapshots.get(key)
+        if snapshot is not None:
+            return snapshot
+
+    path = dataset_path(name)
+    version = file_version(path)
+
+    with _locks[name]:
+        snapshot = _snapshots.get(key)
+        if snapshot is None or snapshot[0] != version:
+            for stale in [k for k, v in _snapshots.items() if k[0] == name and v[0] != version]:
+                del _snapshots[stale]
+            snapshot = (version, _read(name, path, version, columns))
+            _snapshots[key] = snapshot
+
+    return snapshot
+
+
+def load_dataset(name, columns=None):
+    """Return the dataset as a read-only frame, parsing the CSV at most once per file version.
+
+    The parsed frame lives for the whole process and is shared by every
+    session. The first load of a CSV version also writes a typed Parquet copy
+    under ``.cache/``, so later processes skip CSV parsing entirely. When the
+    file on disk changes, the background watcher (see ``start_watcher``)
+    loads the new version and swaps it in; with the watcher off, the next
+    call re-reads it.
+
+    ``columns`` is the page's column manifest: only those columns are read
+    from the Parquet cache and kept in memory.
+    """
+    start_watcher()
+    return _snapshot(name, columns)[1].copy(deep=False)
+
+
+def load_snapshot(name, derived=(), columns=None):
+    """Return ``(version, frame, *objects)`` for one version of the dataset.
+
+    ``derived`` lists ``(key, build)`` pairs; each object is ``build(frame)``,
+    computed once per version as in ``load_derived``. Everything is read
+    under the dataset's lock, so the frame, the objects and the version
+    always belong together, even while the watcher swaps in a new file.
+    Caches keyed on the returned version never mix two versions.
+    """
+    start_watcher()
+    snapshot_key = (name, tuple(columns) if columns is not None else None)
+    while True:
+        _snapshot(name, columns)
+        with _locks[name]:
+            snapshot = _snapshots.get(snapshot_key)
+            # Dropped by a load of a newer version in between: read that one.
+            if snapshot is None:
+                continue
+            version, frame = snapshot
+            objects = []
+            for key, build in derived:
+                _builders[(name, key)] = (build, columns)
+                entry = _derived.get((name, key))
+                if entry is None or entry[0] != version:
+                    entry = (version, build(frame))
+                    _derived[(name, key)] = entry
+                objects.append(entry[1])
+        return (version, frame.copy(deep=False), *objects)
+
+
+def load_derived(name, key, build, columns=None):
+    """Return ``build(frame)`` for the current dataset version, computing it once per version.
+
+    Indexes and aggregates built on top of a dataset go through here so they
+    are shared across sessions and rebuilt only when the file changes.
+    """
+    return load_snapshot(name, [(key, build)], columns)[2]
+
+
+def load_streamed(name, key, build):
+    """Return ``(version, build(path))`` for the current file version, without loading the dataset.
+
+    For aggregates that fold in only the rows appended since their last update
+    (see ``salary_feed``): when the file changes they are brought up to date
+    on their own, and the frame is never parsed for them. The version is the
+    one the object was built from. ``build(path, settled=True)`` is how the
+    watcher calls it, once the file has stopped changing.
+    """
+    start_watcher()
+    entry = _streams.get((name, key))
+    if entry is not None and _watching():
+        return entry[:2]
+    path = dataset_path(name)
+    version = file_version(path)
+    with _locks[name]:
+        entry = _streams.get((name, key))
+        if entry is None or entry[0] != version:
+            entry = (version, build(path), build)
+            _streams[(name, key)] = entry
+    return entry[:2]
+
+
+def reload_error(name):
+    """Why the newest version of a data file was not swapped in, if it failed to load."""
+    failed = _reload_errors.get(name)
+    return failed[1] if failed else None
+
+
+def _reload(name, version):
+    """Load ``version`` of a dataset and every object derived from it, then swap them in at once."""
+    path = dataset_path(name)
+    streams = {
+        key: (version, build(path, settled=True), build)
+        for key, (_, _, build) in list(_streams.items())
+        if key[0] == name
+    }
+    frames = {}
+    for key in [k for k in list(_snapshots) if k[0] == name]:
+        columns = list(key[1]) if key[1] is not None else None
+        frames[key] = _read(name, path, version, columns)
+    derived = {}
+    for (dataset, key), (build, columns) in list(_builders.items()):
+        if dataset == name:
+            snapshot_key = (name, tuple(columns) if columns is not None else None)
+            if snapshot_key not in frames:
+                frames[snapshot_key] = _read(name, path, version, columns)
+            derived[(name, key)] = (version, build(frames[snapshot_key]))
+
+    # The file changed again while it was being read: leave it for the next pass.
+    if file_version(path) != version:
+        return
+    with _locks[name]:
+        for key, frame in frames.items():
+            _snapshots[key] = (version, frame)
+        _derived.update(derived)
+        _streams.update(streams)
+    _reload_errors.pop(name, None)
+
+
+def _watch(interval):
+    seen = {}
+    while True:
+        time.sleep(interval)
+        for name in DATASETS:
+            loaded = dataset_version(name)
+            if loaded is None:
+                continue
+            try:
+                version = file_version(dataset_path(name))
+            except OSError as e:
+                _reload_errors[name] = (None, str(e))
+                continue
+            # Wait until the file has stopped changing for a whole interval, so
+            # a copy still in progress is never read.
+            previous, seen[name] = seen.get(name), version
+            if version == loaded:
+                _reload_errors.pop(name, None)
+                continue
+            if version != previous:
+                continue
+            if _reload_errors.get(name, (None,))[0] == version:
+                continue
+            try:
+                _reload(name, version)
+            except Exception as e:
+                _reload_errors[name] = (version, str(e))
+
+
+def _watching():
+    return _watcher is not None and _watcher.is_alive()
+
+
+def start_watcher(interval=None):
+    """Start the background thread that reloads changed data files (once per process)."""
+    global _watcher
+    interval = WATCH_INTERVAL if interval is None else interval
+    if interval <= 0 or _watching():
+        return
+    with _watcher_lock:
+        if not _watching():
+            _watcher = threading.Thread(target=_watch, args=(interval,), name="data-watcher", daemon=True)
+            _watcher.start()
+
+
+def nbytes(obj, _seen=None):
+    """Approximate bytes held by a frame, array or derived object.
+
+    NumPy buffers shared between views (e.g. FilterIndex slices) are counted once.
+    """
+    seen = set() if _seen is None else _seen
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(np.sum(obj.memory_usage(deep=True)))
+    if isinstance(obj, np.ndarray):
+        base = obj
+        while isinstance(base.base, np.ndarray):
+            base = base.base
+        if id(base) in seen:
+            return 0
+        seen.add(id(base))
+        return base.nbytes
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, dict):
+        return sum(nbytes(value, seen) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(nbytes(value, seen) for value in obj)
+    if hasattr(obj, "__dict__"):
+        return nbytes(vars(obj), seen)
+    return 0
+
+
+def memory_footprint():
+    """Bytes held by every loaded snapshot and derived object, one row per object."""
+    rows = []
+    for (name, columns), (_, frame) in list(_snapshots.items()):
+        rows.append({
+            "dataset": name,
+            "object": "frame" if columns is None else f"frame ({len(columns)} columns)",
+            "rows": len(frame),
+            "bytes": nbytes(frame),
+        })
+    for (name, key), entry in [*_derived.items(), *_streams.items()]:
+        rows.append({"dataset": name, "object": key, "rows": None, "bytes": nbytes(entry[1])})
+    return rows
+
+
+def dataset_version(name):
+    for key, entry in [*_snapshots.items(), *_streams.items()]:
+        if key[0] == name:
+            return entry[0]
+    return None
@@ -0,0 +1,72 @@
+import numpy as np
+import streamlit as st
+
+import instrumentation
+
+PAGE_SIZES = (25, 50, 100, 250)
+
+
+def sort_order(values, ascending=True):
+    """Stable row positions that sort ``values``; missing values go last either way."""
+    ordered = values.reset_index(drop=True).sort_values(
+        ascending=ascending, kind="stable", na_position="last"
+    )
+    return ordered.index.to_numpy()
+
+
+@instrumentation.timed("preview page")
+def page_rows(frame, page, page_size, rows=None, sort_by=None, ascending=True):
+    """One page of ``frame`` (restricted to positions ``rows``), sorted server-side.
+
+    Only the sort column is read for the whole selection; the other columns
+    are taken for the ``page_size`` rows on the page.
+    """
+    positions = np.arange(len(frame)) if rows is None else np.asarray(rows)
+    if sort_by is not None:
+        positions = positions[sort_order(frame[sort_by].take(positions), ascending)]
+    start = (page - 1) * page_size
+    return frame.take(positions[start:start + page_size])
+
+
+@st.fragment
+@instrumentation.fragment_run("data preview")
+def data_preview(frame, key, rows=None, label="Data Preview"):
+    """A collapsed preview of ``frame`` that pages through rows only once it is opened.
+
+    ``frame`` can also be a function returning ``(frame, rows)``, so a page
+    whose charts don't read the frame only loads it when the preview opens.
+    """
+    expander = st.expander(label, key=key, on_change="rerun")
+    if not expander.open:
+        return
+    if callable(frame):
+        frame, rows = frame()
+
+    with expander:
+        n_rows = len(frame) if rows is None else len(rows)
+        sort_col, order_col, size_col, page_col = st.columns([3, 2, 2, 2])
+        sort_by = sort_col.selectbox(
+            "Sort by",
+            options=[None] + list(frame.columns),
+            format_func=lambda column: "Original order" if column is None else column,
+            key=f"{key}-sort",
+        )
+        order = order_col.selectbox(
+            "Order",
+            options=["Ascending", "Descending"],
+            key=f"{key}-order",
+            disabled=sort_by is None,
+        )
+        page_size = size_col.selectbox("Rows per page", options=PAGE_SIZES, key=f"{key}-size")
+
+        n_pages = max(1, -(-n_rows // page_size))
+        page_key = f"{key}-page"
+        # Filters or a bigger page size can leave the current page past the end.
+        if st.session_state.get(page_key, 1) > n_pages:
+            st.session_state[page_key] = n_pages
+        page = page_col.number_input("Page", min_value=1, max_value=n_pages, step=1, key=page_key)
+
+        shown = page_rows(frame, page, page_size, rows, sort_by, order == "Ascending")
+        st.dataframe(shown, width="stretch")
+        first = (page - 1) * page_size
+        st.caption(f"Rows {min(first + 1, n_rows):,}–{first + len(shown):,} of {n_rows:,}")
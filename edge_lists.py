@@ -0,0 +1,98 @@
+import threading
+from dataclasses import dataclass
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from data_loader import DATA_DIR, file_version
+
+EDGE_LIST_PATTERNS = ("*.edges.csv", "*.edges.tsv")
+CHUNK_ROWS = 500_000
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class EdgeList:
+    """Edges as integer node ids plus a table of interned node names."""
+
+    names: np.ndarray
+    source: np.ndarray
+    target: np.ndarray
+    weight: np.ndarray | None = None
+
+    def __len__(self):
+        return len(self.source)
+
+
+def available_edge_lists(data_dir=DATA_DIR):
+    paths = {path for pattern in EDGE_LIST_PATTERNS for path in data_dir.glob(pattern)}
+    return sorted(paths)
+
+
+def _intern(index, values):
+    """Map names to ids, appending unseen names to ``index``."""
+    codes = index.get_indexer(values)
+    unseen = codes == -1
+    if unseen.any():
+        index = index.append(pd.Index(pd.unique(values[unseen])))
+        codes[unseen] = index.get_indexer(values[unseen])
+    return index, codes
+
+
+def read_edge_list(path, chunk_rows=CHUNK_ROWS):
+    """Stream a CSV/TSV edge list (``source, target[, weight]``) into an :class:`EdgeList`.
+
+    Rows are read in bounded chunks; node names are interned to dense int32
+    ids as they are first seen. A file without any edges raises ``ValueError``.
+    """
+    sep = "\t" if path.suffix == ".tsv" else ","
+    index = pd.Index([], dtype=object)
+    sources, targets, weights = [], [], []
+
+    reader = pd.read_csv(path, sep=sep, chunksize=chunk_rows, dtype={0: str, 1: str})
+    for chunk in reader:
+        if chunk.shape[1] < 2:
+            raise ValueError(f"{path.name}: expected at least source and target columns")
+        # Interleave endpoints so ids follow the order nodes first appear in.
+        endpoints = chunk.iloc[:, :2].to_numpy(dtype=object).ravel()
+        index, codes = _intern(index, endpoints)
+        codes = codes.astype(np.int32).reshape(-1, 2)
+        sources.append(codes[:, 0])
+        targets.append(codes[:, 1])
+        if chunk.shape[1] > 2:
+            weights.append(pd.to_numeric(chunk.iloc[:, 2]).to_numpy(dtype=np.float32))
+
+    if not sources or not sum(map(len, sources)):
+        raise ValueError(f"{path.name}: the edge list has no edges")
+    return EdgeList(
+        names=index.to_numpy(dtype=object),
+        source=np.concatenate(sources),
+        target=np.concatenate(targets),
+        weight=np.concatenate(weights) if weights else None,
+    )
+
+
+def to_graph(edges):
+    G = nx.Graph()
+    G.add_nodes_from(edges.names)
+    source_names = edges.names[edges.source]
+    target_names = edges.names[edges.target]
+    if edges.weight is None:
+        G.add_edges_from(zip(source_names, target_names))
+    else:
+        G.add_weighted_edges_from(zip(source_names, target_names, edges.weight.tolist()))
+    return G
+
+
+def load_graph(path):
+    """Graph for an edge-list file, parsed once per file version and shared across sessions."""
+    version = file_version(path)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is None or cached[0] != version:
+            cached = (version, to_graph(read_edge_list(path)))
+            _cache[path] = cached
+    return cached[1]
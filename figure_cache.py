@@ -0,0 +1,121 @@
+import io
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+import plotly.io as pio
+
+import instrumentation
+import result_store
+
+MAX_ENTRIES = 512
+MAX_BYTES = 64 * 1024 * 1024
+
+
+class FigureCache:
+    """LRU store of serialized figures, bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+            return payload
+
+    def put(self, key, payload):
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            if len(payload) > self.max_bytes:
+                return
+            self._entries[key] = payload
+            self.size += len(payload)
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+figures = FigureCache()
+
+
+def _normalize(value):
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _normalize(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_normalize(v) for v in value]
+        return tuple(sorted(items, key=repr)) if isinstance(value, (set, frozenset, list)) else tuple(items)
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def figure_key(page, chart, filters, theme=None, version=None):
+    """Cache key for one chart; selection order inside a filter doesn't matter."""
+    return (page, chart, _normalize(filters), theme, _normalize(version))
+
+
+def _shared(key):
+    """Payload from the in-process LRU, falling back to the store shared with other processes."""
+    payload = figures.get(key)
+    if payload is not None:
+        return payload, "hit"
+    payload = result_store.get(("figure",) + key)
+    if payload is not None:
+        figures.put(key, payload)
+        return payload, "shared"
+    return None, "miss"
+
+
+def _store(key, payload):
+    figures.put(key, payload)
+    result_store.put(("figure",) + key, payload)
+
+
+def cached_figure(page, chart, filters, theme, version, build):
+    """A Plotly figure from the cache, or ``build()`` serialized into it on a miss."""
+    key = figure_key(page, chart, filters, theme, version)
+    payload, cache = _shared(key)
+    if payload is None:
+        with instrumentation.stage("build"):
+            fig = build()
+        with instrumentation.stage("serialize"):
+            payload = fig.to_json().encode()
+        _store(key, payload)
+        instrumentation.annotate(cache=cache, bytes=len(payload))
+        return fig
+    with instrumentation.stage("deserialize"):
+        fig = pio.from_json(payload)
+    instrumentation.annotate(cache=cache, bytes=len(payload))
+    return fig
+
+
+def cached_png(page, chart, filters, theme, version, build, dpi=100):
+    """PNG bytes for a matplotlib figure, rendered by ``build()`` only on a miss."""
+    key = figure_key(page, chart, filters, theme, version)
+    payload, cache = _shared(key)
+    if payload is None:
+        with instrumentation.stage("build"):
+            fig = build()
+        with instrumentation.stage("rasterize"):
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+            plt.close(fig)
+            payload = buffer.getvalue()
+        _store(key, payload)
+    instrumentation.annotate(cache=cache, bytes=len(payload))
+    return payload
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+_EMPTY = np.empty(0, dtype=np.intp)
+
+
+class FilterIndex:
+    """Sorted row positions for every value of the filterable columns of a frame.
+
+    Built once per dataset version, so a sidebar filter combination resolves by
+    merging/intersecting small position arrays instead of copying the frame and
+    chaining boolean masks over every row.
+    """
+
+    def __init__(self, frame, columns):
+        self.size = len(frame)
+        self.positions = {}
+        # Positions are stored as int32 while they fit, halving the index.
+        dtype = np.int32 if self.size <= np.iinfo(np.int32).max else np.intp
+        for col in columns:
+            codes, uniques = pd.factorize(frame[col], sort=True)
+            order = np.argsort(codes, kind="stable").astype(dtype, copy=False)
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            self.positions[col] = {
+                value: order[bounds[i]:bounds[i + 1]]
+                for i, value in enumerate(uniques.tolist())
+            }
+
+    def values(self, col):
+        return list(self.positions[col])
+
+    def lookup(self, col, values):
+        """Sorted positions of the rows whose ``col`` is any of ``values``."""
+        index = self.positions[col]
+        parts = [index[value] for value in values if value in index]
+        if not parts:
+            return _EMPTY
+        if len(parts) == 1:
+            return parts[0]
+        return np.sort(np.concatenate(parts))
+
+    def select(self, filters):
+        """Row positions matching every ``{column: allowed values}`` entry.
+
+        Columns mapped to ``None`` are unfiltered. Returns ``None`` when no
+        filter is active, meaning "all rows".
+        """
+        result = None
+        for col, values in filters.items():
+            if values is None:
+                continue
+            positions = self.lookup(col, values)
+            if result is None:
+                result = positions
+            else:
+                result = np.intersect1d(result, positions, assume_unique=True)
+        return result
+
+
+def apply_filters(frame, index, filters):
+    positions = index.select(filters)
+    if positions is None:
+        return frame
+    return frame.take(positions)
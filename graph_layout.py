@@ -0,0 +1,230 @@
+import threading
+
+import networkx as nx
+import numpy as np
+from scipy.spatial import cKDTree
+
+import result_store
+from network_metrics import graph_hash
+
+# Below this size nx.spring_layout is fast enough and keeps small drawings
+# identical to what the page has always shown.
+LARGE_GRAPH = 500
+COARSEST_SIZE = 100
+WARM_START_ITERATIONS = 20
+MEMORY_ENTRIES = 16
+REPULSION_NEIGHBOURS = 8
+NEIGHBOUR_REFRESH = 5
+GRID_CELLS = 16
+
+_memory = {}
+_lock = threading.Lock()
+
+
+def _edge_arrays(G, index):
+    edges = np.array([(index[u], index[v]) for u, v in G.edges() if u != v], dtype=np.intp)
+    return edges.reshape(-1, 2)
+
+
+def _scatter_add(disp, index, force):
+    for axis in range(2):
+        disp[:, axis] += np.bincount(index, weights=force[:, axis], minlength=len(disp))
+
+
+def _far_repulsion(pos, k, disp):
+    """Far-field repulsion on a grid: cells push each other by their mass and centre.
+
+    Every node receives the force acting on its cell, so the cost is
+    O(n + cells^2) whatever the layout looks like.
+    """
+    low = pos.min(axis=0)
+    span = np.maximum(pos.max(axis=0) - low, 1e-9)
+    cell = np.minimum(((pos - low) / span * GRID_CELLS).astype(np.intp), GRID_CELLS - 1)
+    cell_id = cell[:, 0] * GRID_CELLS + cell[:, 1]
+
+    occupied, cell_of_node, mass = np.unique(cell_id, return_inverse=True, return_counts=True)
+    centre = np.column_stack([
+        np.bincount(cell_of_node, weights=pos[:, axis]) / mass
+        for axis in range(2)
+    ])
+    delta = centre[:, None, :] - centre[None, :, :]
+    weight = mass[None, :] / np.maximum((delta ** 2).sum(axis=2), (span.max() / GRID_CELLS) ** 2)
+    # A cell does not push itself; nearby nodes are handled by the exact term.
+    np.fill_diagonal(weight, 0)
+    field = k * k * (delta * weight[:, :, None]).sum(axis=1)
+    disp += field[cell_of_node]
+
+
+def _force_directed(pos, edges, iterations, k, temperature):
+    """Fruchterman-Reingold with approximate repulsion.
+
+    Each node is repelled exactly by its ``REPULSION_NEIGHBOURS`` nearest
+    nodes within ``2k`` and approximately by a ``GRID_CELLS`` x
+    ``GRID_CELLS`` far-field grid, so an iteration costs O(n + m) instead of
+    O(n^2). Neighbour lists come from a KD-tree rebuilt every
+    ``NEIGHBOUR_REFRESH`` iterations, as nodes only move a little per step.
+    """
+    n = len(pos)
+    cooling = temperature / (iterations + 1)
+    rows = nearest = None
+    for iteration in range(iterations):
+        disp = np.zeros_like(pos)
+
+        if n > 1 and iteration % NEIGHBOUR_REFRESH == 0:
+            found_k = min(REPULSION_NEIGHBOURS + 1, n)
+            _, nearest = cKDTree(pos).query(pos, k=found_k, distance_upper_bound=2 * k)
+            nearest = nearest[:, 1:]
+            found = nearest < n
+            rows = np.broadcast_to(np.arange(n)[:, None], nearest.shape)[found]
+            nearest = nearest[found]
+
+        if rows is not None and len(rows):
+            delta = pos[rows] - pos[nearest]
+            dist2 = np.maximum((delta ** 2).sum(axis=1), 1e-8)
+            _scatter_add(disp, rows, delta * (k * k / dist2)[:, None])
+        if n > 1:
+            _far_repulsion(pos, k, disp)
+
+        if len(edges):
+            delta = pos[edges[:, 0]] - pos[edges[:, 1]]
+            dist = np.sqrt(np.maximum((delta ** 2).sum(axis=1), 1e-9))
+            force = delta * (dist / k)[:, None]
+            _scatter_add(disp, edges[:, 0], -force)
+            _scatter_add(disp, edges[:, 1], force)
+
+        length = np.sqrt(np.maximum((disp ** 2).sum(axis=1), 1e-9))
+        pos = pos + disp * (np.minimum(length, temperature) / length)[:, None]
+        temperature = max(temperature - cooling, 1e-4)
+    return pos
+
+
+def _coarsen(n, edges, rng):
+    """Collapse a random maximal matching; returns the coarse node id of every node.
+
+    Nodes left unmatched (e.g. the leaves around a hub) join the group of one
+    of their neighbours, so star-like graphs still shrink level by level.
+    """
+    matched = [-1] * n
+    for a, b in edges[rng.permutation(len(edges))].tolist():
+        if matched[a] < 0 and matched[b] < 0:
+            matched[a] = b
+            matched[b] = a
+    matched = np.array(matched)
+    nodes = np.arange(n)
+    representative = np.where(matched >= 0, np.minimum(nodes, matched), nodes)
+
+    unmatched = matched < 0
+    for a, b in ((edges[:, 0], edges[:, 1]), (edges[:, 1], edges[:, 0])):
+        join = unmatched[a] & ~unmatched[b]
+        representative[a[join]] = representative[b[join]]
+
+    _, parent = np.unique(representative, return_inverse=True)
+    return parent
+
+
+def _multilevel(n, edges, seed):
+    rng = np.random.default_rng(seed)
+    levels = []
+    while n > COARSEST_SIZE:
+        parent = _coarsen(n, edges, rng)
+        n_coarse = parent.max() + 1
+        if n_coarse > 0.9 * n:
+            break
+        levels.append((n, edges, parent))
+        coarse = parent[edges]
+        coarse = np.unique(np.sort(coarse[coarse[:, 0] != coarse[:, 1]], axis=1), axis=0)
+        n, edges = n_coarse, coarse
+
+    k = 1 / np.sqrt(n)
+    pos = _force_directed(rng.random((n, 2)), edges, 200, k, 0.1)
+    for n_fine, fine_edges, parent in reversed(levels):
+        k = 1 / np.sqrt(n_fine)
+        pos = pos[parent] + rng.normal(scale=k * 0.1, size=(n_fine, 2))
+        pos = _force_directed(pos, fine_edges, 30, k, 3 * k)
+    return pos
+
+
+def _warm_positions(G, nodes, previous, rng):
+    """Start from cached positions; new nodes go to the centre of their placed neighbours."""
+    pos = np.empty((len(nodes), 2))
+    placed = np.zeros(len(nodes), dtype=bool)
+    for i, node in enumerate(nodes):
+        if node in previous:
+            pos[i] = previous[node]
+            placed[i] = True
+    index = {node: i for i, node in enumerate(nodes)}
+    for i in np.flatnonzero(~placed):
+        neighbours = [index[v] for v in G[nodes[i]] if placed[index[v]]]
+        if neighbours:
+            pos[i] = pos[neighbours].mean(axis=0) + rng.normal(scale=0.01, size=2)
+        else:
+            pos[i] = rng.uniform(-1, 1, size=2)
+    return pos
+
+
+def _layout(G, seed, previous):
+    nodes = list(G)
+    if len(nodes) < LARGE_GRAPH:
+        if previous:
+            initial = {node: previous[node] for node in nodes if node in previous}
+            # spring_layout fails on an empty ``pos``, e.g. once every node was removed.
+            if initial:
+                return nx.spring_layout(G, pos=initial, seed=seed, iterations=WARM_START_ITERATIONS)
+        return nx.spring_layout(G, seed=seed)
+
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = _edge_arrays(G, index)
+    if previous:
+        rng = np.random.default_rng(seed)
+        pos = _warm_positions(G, nodes, previous, rng)
+        k = 2 / np.sqrt(len(nodes))
+        pos = _force_directed(pos, edges, WARM_START_ITERATIONS, k, k)
+    else:
+        pos = _multilevel(len(nodes), edges, seed)
+    pos = nx.rescale_layout(pos)
+    return dict(zip(nodes, pos))
+
+
+def _load(key, seed):
+    stored = result_store.get_object(("layout", key, seed))
+    if stored is None:
+        return None
+    nodes, positions = stored
+    return dict(zip(nodes, positions))
+
+
+def _save(key, seed, pos):
+    positions = np.array(list(pos.values()), dtype=np.float64).reshape(-1, 2)
+    result_store.put_object(("layout", key, seed), (list(pos), positions))
+
+
+def graph_layout(G, seed=42, key=None, lineage=None):
+    """Node positions for ``G``, cached in memory and in the shared result store by graph hash + seed.
+
+    ``lineage`` names where the graph came from (e.g. its edge-list file).
+    When the exact graph has no cached layout but an earlier version of the
+    same lineage does, the old positions seed a short refinement instead of a
+    full layout run, so a few edited edges don't reshuffle the whole drawing.
+    """
+    key = key or graph_hash(G)
+    with _lock:
+        if (key, seed) in _memory:
+            return _memory[(key, seed)]
+
+    pos = _load(key, seed)
+    if pos is None or set(pos) != set(G):
+        previous = None
+        if lineage is not None:
+            latest = result_store.get_object(("layout-lineage", lineage, seed))
+            previous = _load(latest, seed) if latest is not None else None
+        pos = _layout(G, seed, previous)
+        # The store bounds its size and evicts least recently used layouts.
+        _save(key, seed, pos)
+        if lineage is not None:
+            result_store.put_object(("layout-lineage", lineage, seed), key)
+
+    with _lock:
+        _memory[(key, seed)] = pos
+        while len(_memory) > MEMORY_ENTRIES:
+            del _memory[next(iter(_memory))]
+    return pos
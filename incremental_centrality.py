@@ -0,0 +1,217 @@
+from collections import deque
+
+import networkx as nx
+import pandas as pd
+
+from network_metrics import centrality_metrics, eigenvector_centrality
+
+# Edits whose affected sources exceed this share of the graph recompute every
+# metric with network_metrics instead (cached and spread over its process
+# pool), which is faster than re-running that many passes one by one.
+RECOMPUTE_SHARE = 0.25
+
+
+def _bfs_distances(G, source):
+    dist = {source: 0}
+    queue = deque([source])
+    while queue:
+        v = queue.popleft()
+        for w in G[v]:
+            if w not in dist:
+                dist[w] = dist[v] + 1
+                queue.append(w)
+    return dist
+
+
+def _single_source(G, source):
+    """Brandes dependencies of every node on ``source``, plus BFS distances from it."""
+    order = []
+    preds = {source: []}
+    sigma = {source: 1}
+    dist = {source: 0}
+    queue = deque([source])
+    while queue:
+        v = queue.popleft()
+        order.append(v)
+        for w in G[v]:
+            if w not in dist:
+                dist[w] = dist[v] + 1
+                sigma[w] = 0
+                preds[w] = []
+                queue.append(w)
+            if dist[w] == dist[v] + 1:
+                sigma[w] += sigma[v]
+                preds[w].append(v)
+
+    delta = dict.fromkeys(order, 0.0)
+    for w in reversed(order):
+        for v in preds[w]:
+            delta[v] += sigma[v] / sigma[w] * (1 + delta[w])
+    delta[source] = 0.0
+    return delta, dist
+
+
+class IncrementalCentrality:
+    """Degree, betweenness, closeness and eigenvector centrality kept current across edge edits.
+
+    Works on unweighted, undirected graphs (the same shortest paths the page's
+    metrics use). Adding or removing an edge only re-runs the single-source
+    shortest-path passes for sources whose distances or path counts to the
+    edge's endpoints can change, degree is updated in O(1), and eigenvector
+    centrality restarts power iteration from the previous vector.
+
+    ``metrics`` is the graph's exact metrics table from
+    ``network_metrics.centrality_metrics``, when the caller has it; the
+    tracker starts from it instead of running every pass itself.
+    """
+
+    def __init__(self, G, metrics=None):
+        self.G = nx.Graph(G)
+        self.degree = dict(self.G.degree())
+        self._stale = False
+        if metrics is not None and len(self.G) > 2:
+            self._seed(metrics)
+            return
+        self.raw_betweenness = dict.fromkeys(self.G, 0.0)
+        self.reach = {}
+        self.distance_sum = {}
+        for source in self.G:
+            self._add_source(source)
+        self.eigenvector = eigenvector_centrality(self.G)
+
+    def _seed(self, metrics):
+        """Recover the per-source sums behind a metrics table (the inverse of ``metrics()``)."""
+        n = self.G.number_of_nodes()
+        self.reach = {}
+        for component in nx.connected_components(self.G):
+            self.reach.update(dict.fromkeys(component, len(component)))
+        self.raw_betweenness = (metrics["Betweenness"] * ((n - 1) * (n - 2))).to_dict()
+        self.distance_sum = {}
+        for node, closeness in metrics["Closeness"].items():
+            reach = self.reach[node]
+            self.distance_sum[node] = round((reach - 1) ** 2 / ((n - 1) * closeness)) if closeness > 0 else 0
+        self.eigenvector = metrics["Eigenvector"].to_dict()
+
+    def _add_source(self, source, sign=1):
+        delta, dist = _single_source(self.G, source)
+        for node, value in delta.items():
+            self.raw_betweenness[node] += sign * value
+        if sign > 0:
+            self.reach[source] = len(dist)
+            self.distance_sum[source] = sum(dist.values())
+
+    def _affected_sources(self, u, v, adding):
+        """Sources whose shortest paths through/around edge (u, v) can change."""
+        from_u = _bfs_distances(self.G, u)
+        from_v = _bfs_distances(self.G, v)
+        affected = []
+        for source in self.G:
+            a, b = from_u.get(source), from_v.get(source)
+            if a is None and b is None:
+                continue
+            if adding:
+                if a is None or b is None or a != b:
+                    affected.append(source)
+            elif a is not None and b is not None and abs(a - b) == 1:
+                affected.append(source)
+        return affected
+
+    def _edit_edge(self, u, v, adding):
+        affected = [] if self._stale else self._affected_sources(u, v, adding)
+        if self._stale or len(affected) > RECOMPUTE_SHARE * len(self.G):
+            # Only the graph is edited here; _recompute() catches up afterwards.
+            self._stale = True
+            affected = list(self.G)
+        else:
+            for source in affected:
+                self._add_source(source, sign=-1)
+        if adding:
+            self.G.add_edge(u, v)
+        else:
+            self.G.remove_edge(u, v)
+        delta = 1 if adding else -1
+        self.degree[u] += delta
+        self.degree[v] += delta
+        if not self._stale:
+            for source in affected:
+                self._add_source(source)
+        return len(affected)
+
+    def _recompute(self):
+        self._seed(centrality_metrics(self.G))
+        self._stale = False
+
+    def add_node(self, node):
+        if node in self.G:
+            return
+        self.G.add_node(node)
+        self.degree[node] = 0
+        self.raw_betweenness[node] = 0.0
+        self.reach[node] = 1
+        self.distance_sum[node] = 0
+
+    def add_edge(self, u, v):
+        """Add edge (u, v), creating missing nodes; returns how many sources were recomputed."""
+        if u == v or self.G.has_edge(u, v):
+            return 0
+        self.add_node(u)
+        self.add_node(v)
+        touched = self._edit_edge(u, v, adding=True)
+        self._refresh()
+        return touched
+
+    def remove_edge(self, u, v):
+        if not self.G.has_edge(u, v):
+            return 0
+        touched = self._edit_edge(u, v, adding=False)
+        self._refresh()
+        return touched
+
+    def remove_node(self, node):
+        """Remove a node by removing its edges one at a time, then the isolated node."""
+        if node not in self.G:
+            return 0
+        touched = 0
+        for neighbour in list(self.G[node]):
+            touched += self._edit_edge(node, neighbour, adding=False)
+        self.G.remove_node(node)
+        for values in (self.degree, self.raw_betweenness, self.reach, self.distance_sum, self.eigenvector):
+            values.pop(node, None)
+        self._refresh()
+        return min(touched, len(self.G))
+
+    def _refresh(self):
+        if self._stale:
+            self._recompute()
+        else:
+            self._refresh_eigenvector()
+
+    def _refresh_eigenvector(self):
+        if self.G.number_of_edges() == 0:
+            self.eigenvector = dict.fromkeys(self.G, 0.0)
+            return
+        known = [value for node, value in self.eigenvector.items() if node in self.G]
+        fill = sum(known) / len(known) if known and sum(known) > 0 else 1.0
+        start = {node: self.eigenvector.get(node) or fill for node in self.G}
+        self.eigenvector = eigenvector_centrality(self.G, nstart=start)
+
+    def metrics(self):
+        """The page's metrics table, normalized like the NetworkX functions."""
+        n = self.G.number_of_nodes()
+        degree_scale = 1 / (n - 1) if n > 1 else 0.0
+        betweenness_scale = 1 / ((n - 1) * (n - 2)) if n > 2 else 0.0
+        closeness = {}
+        for node in self.G:
+            reach, total = self.reach[node], self.distance_sum[node]
+            if total > 0 and n > 1:
+                closeness[node] = (reach - 1) / total * (reach - 1) / (n - 1)
+            else:
+                closeness[node] = 0.0
+        return pd.DataFrame({
+            "Degree": pd.Series({node: d * degree_scale for node, d in self.degree.items()}),
+            "Betweenness": pd.Series({
+                node: value * betweenness_scale for node, value in self.raw_betweenness.items()
+            }),
+            "Closeness": pd.Series(closeness),
+            "Eigenvector": pd.Series(self.eigenvector),
+        }).sort_values("Degree", ascending=False)
@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+import pandas as pd
+import streamlit as st
+
+import data_loader
+
+# Set to a file path to append one JSON line per rerun, e.g.
+# APP_TIMINGS_LOG=.cache/timings.jsonl streamlit run Bio.py
+LOG_ENV = "APP_TIMINGS_LOG"
+# Add ?timings=1 to a page URL to show the sidebar panel.
+QUERY_PARAM = "timings"
+
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+class Run:
+    """Stages recorded during one rerun of one page (or of one fragment)."""
+
+    def __init__(self, page):
+        self.page = page
+        self.started = time.time()
+        self.seconds = None
+        self.stages = []
+        self._open = []
+        self._start = time.perf_counter()
+
+    def to_dict(self):
+        return {
+            "page": self.page,
+            "started": self.started,
+            "seconds": self.seconds,
+            "stages": self.stages,
+        }
+
+
+def begin(page):
+    _local.run = Run(page)
+    return _local.run
+
+
+def current():
+    """The unfinished run of this script thread, if any."""
+    run = getattr(_local, "run", None)
+    return run if run is not None and run.seconds is None else None
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """Time a block; the yielded dict can take ``rows_out``, ``bytes`` and similar fields.
+
+    Outside an instrumented run this only yields a throwaway dict.
+    """
+    run = current()
+    record = {"stage": name}
+    if rows_in is not None:
+        record["rows_in"] = int(rows_in)
+    if run is None:
+        yield record
+        return
+    record["depth"] = len(run._open)
+    run.stages.append(record)
+    run._open.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        run._open.pop()
+
+
+def annotate(**fields):
+    """Add fields to the innermost open stage, e.g. from a helper that doesn't own it."""
+    run = current()
+    if run is not None and run._open:
+        run._open[-1].update(fields)
+
+
+def timed(name=None):
+    """Decorator form of ``stage``; a returned DataFrame's length is kept as ``rows_out``."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name or func.__name__) as record:
+                result = func(*args, **kwargs)
+                if isinstance(result, pd.DataFrame):
+                    record["rows_out"] = len(result)
+                return result
+        return wrapper
+    return decorate
+
+
+def fragment_run(name):
+    """Decorator for ``st.fragment`` bodies.
+
+    During a full rerun the fragment's stages join the page's run; a
+    fragment-only rerun records (and logs) a run of its own.
+    """
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if current() is not None:
+                return func(*args, **kwargs)
+            begin(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                finish()
+        return wrapper
+    return decorate
+
+
+def detached(func):
+    """Wrap ``func`` for a worker thread: it records into a private run and returns ``(result, stages)``.
+
+    Pass the stages to ``adopt`` on the script thread to keep them in the page's run.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        _local.run = Run(None)
+        try:
+            return func(*args, **kwargs), _local.run.stages
+        finally:
+            _local.run = None
+    return wrapper
+
+
+def adopt(stages):
+    """Nest stages recorded by a ``detached`` call under this thread's innermost open stage."""
+    run = current()
+    if run is not None:
+        depth = len(run._open)
+        run.stages.extend({**record, "depth": record["depth"] + depth} for record in stages)
+
+
+def finish():
+    run = current()
+    if run is None:
+        return None
+    run.seconds = time.perf_counter() - run._start
+    path = os.environ.get(LOG_ENV)
+    if path:
+        line = json.dumps(run.to_dict(), default=str)
+        with _log_lock, open(path, "a", encoding="utf-8") as log:
+            log.write(line + "\n")
+    return run
+
+
+def panel_enabled():
+    return st.query_params.get(QUERY_PARAM) == "1"
+
+
+def render_panel(run):
+    with st.sidebar:
+        st.header("⏱️ Timings")
+        st.caption(f"{run.page}: {run.seconds * 1000:,.1f} ms for the last full rerun")
+        stages = pd.DataFrame(run.stages)
+        if not stages.empty:
+            stages["stage"] = ["· " * depth + name for depth, name in zip(stages.pop("depth"), stages["stage"])]
+            stages.insert(1, "ms", stages.pop("seconds") * 1000)
+            st.dataframe(stages, hide_index=True, width="stretch")
+        footprint = pd.DataFrame(data_loader.memory_footprint())
+        if not footprint.empty:
+            st.caption("Shared dataset memory in this process")
+            footprint["MB"] = footprint.pop("bytes") / 1024 / 1024
+            st.dataframe(footprint, hide_index=True, width="stretch")
+        st.download_button(
+            "Download JSON",
+            data=json.dumps(run.to_dict(), indent=2, default=str),
+            file_name=f"timings-{int(run.started)}.json",
+            mime="application/json",
+        )
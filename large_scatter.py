@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from binning import histogram_2d
+
+# Up to WEBGL_THRESHOLD points render as SVG markers, up to DENSITY_THRESHOLD as
+# WebGL markers. Beyond that each group is drawn as density contours on a fixed
+# grid, with a deterministic stratified sample of points kept for hover.
+WEBGL_THRESHOLD = 5_000
+DENSITY_THRESHOLD = 100_000
+DENSITY_BINS = 80
+HOVER_SAMPLE = 2_000
+
+
+def scatter_mode(n_rows):
+    if n_rows > DENSITY_THRESHOLD:
+        return "density"
+    if n_rows > WEBGL_THRESHOLD:
+        return "webgl"
+    return "svg"
+
+
+def stratified_sample(frame, by, n, seed=0):
+    """Up to ``n`` rows, split across the groups of ``by`` in proportion to their size.
+
+    Every non-empty group keeps at least one row, and the same frame and seed
+    always give the same sample.
+    """
+    if len(frame) <= n:
+        return frame
+    rng = np.random.default_rng(seed)
+    codes, _ = pd.factorize(frame[by])
+    picked = []
+    for code in np.unique(codes):
+        positions = np.flatnonzero(codes == code)
+        share = max(1, round(n * len(positions) / len(frame)))
+        picked.append(np.sort(rng.permutation(positions)[:share]))
+    return frame.take(np.sort(np.concatenate(picked)))
+
+
+def _density_figure(frame, x, y, color, color_map, labels, opacity):
+    x_all = frame[x].to_numpy(dtype=np.float64)
+    y_all = frame[y].to_numpy(dtype=np.float64)
+    x_range = (np.nanmin(x_all), np.nanmax(x_all))
+    y_range = (np.nanmin(y_all), np.nanmax(y_all))
+    x_edges = np.linspace(*x_range, DENSITY_BINS + 1)
+    y_edges = np.linspace(*y_range, DENSITY_BINS + 1)
+
+    fig = go.Figure()
+    groups = frame[color].to_numpy()
+    for group, group_color in color_map.items():
+        keep = groups == group
+        _, _, counts = histogram_2d(x_all[keep], y_all[keep], x_edges, y_edges)
+        fig.add_trace(go.Contour(
+            x=(x_edges[:-1] + x_edges[1:]) / 2,
+            y=(y_edges[:-1] + y_edges[1:]) / 2,
+            z=counts.T,
+            name=str(group),
+            legendgroup=str(group),
+            showlegend=False,
+            showscale=False,
+            contours_coloring="lines",
+            colorscale=[[0, group_color], [1, group_color]],
+            hoverinfo="skip",
+        ))
+
+    sample = stratified_sample(frame, color, HOVER_SAMPLE)
+    for group, group_color in color_map.items():
+        rows = sample[sample[color] == group]
+        fig.add_trace(go.Scattergl(
+            x=rows[x],
+            y=rows[y],
+            mode="markers",
+            name=str(group),
+            legendgroup=str(group),
+            marker={"color": group_color, "size": 4},
+            opacity=opacity,
+            hovertemplate=f"{labels.get(x, x)}=%{{x}}<br>{labels.get(y, y)}=%{{y}}<extra>{group}</extra>",
+        ))
+
+    fig.update_layout(xaxis_title=labels.get(x, x), yaxis_title=labels.get(y, y))
+    return fig
+
+
+def scatter_figure(frame, x, y, color, labels, title, color_sequence=None, opacity=0.5):
+    """A colored scatter whose rendering strategy depends on the number of rows."""
+    color_sequence = color_sequence or px.colors.qualitative.Plotly
+    mode = scatter_mode(len(frame))
+    if mode == "density":
+        groups = [group for group in frame[color].unique().tolist() if group == group]
+        color_map = {
+            group: color_sequence[i % len(color_sequence)]
+            for i, group in enumerate(sorted(groups))
+        }
+        fig = _density_figure(frame, x, y, color, color_map, labels, opacity)
+        fig.update_layout(title=title, legend_title_text=labels.get(color, color))
+        return fig
+
+    return px.scatter(
+        frame,
+        x=x,
+        y=y,
+        color=color,
+        opacity=opacity,
+        labels=labels,
+        title=title,
+        color_discrete_sequence=color_sequence,
+        render_mode="webgl" if mode == "webgl" else "svg",
+    )
+
+
+def recolor_groups(fig, color_sequence):
+    """Re-apply a color sequence to a figure from ``scatter_figure`` without rebuilding it.
+
+    Groups take colors in order of first appearance, which is how both the
+    Plotly Express and the density figures assign them.
+    """
+    colors = {}
+    for trace in fig.data:
+        group = trace.legendgroup or trace.name
+        group_color = colors.setdefault(group, color_sequence[len(colors) % len(color_sequence)])
+        if trace.type == "contour":
+            trace.colorscale = [[0, group_color], [1, group_color]]
+        else:
+            trace.marker.color = group_color
@@ -0,0 +1,214 @@
+import hashlib
+import multiprocessing
+import os
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+from scipy.sparse.linalg import eigsh
+
+import community_detection
+import result_store
+
+# Graphs with at least this many nodes have betweenness/closeness spread over
+# a process pool; below it the pool start-up costs more than it saves.
+PARALLEL_THRESHOLD = 2_000
+CACHE_SIZE = 16
+# Edge edits touching more than this share of the graph re-run community
+# detection from scratch instead of updating the previous result.
+INCREMENTAL_LIMIT = 0.05
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def graph_hash(G):
+    """Content hash of a graph: node set, edge set (with weights) and directedness."""
+    digest = hashlib.sha256()
+    digest.update(b"directed" if G.is_directed() else b"undirected")
+    for node in sorted(map(repr, G.nodes())):
+        digest.update(node.encode())
+        digest.update(b"\0")
+    edges = []
+    for u, v, weight in G.edges(data="weight"):
+        u, v = repr(u), repr(v)
+        if not G.is_directed() and v < u:
+            u, v = v, u
+        edges.append(f"{u}\t{v}\t{weight!r}")
+    for edge in sorted(edges):
+        digest.update(edge.encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def _cached(key, compute):
+    """In-process LRU in front of the store shared with the other app processes."""
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    value = result_store.get_object(("network",) + key)
+    if value is None:
+        value = compute()
+        result_store.put_object(("network",) + key, value)
+    with _cache_lock:
+        _cache[key] = value
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value
+
+
+def _workers():
+    return os.cpu_count() or 1
+
+
+def _executor():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers never inherit the Streamlit server's threads.
+            _pool = ProcessPoolExecutor(
+                max_workers=_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _chunks(items, n_chunks):
+    size = -(-len(items) // n_chunks)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _betweenness_chunk(G, sources):
+    return nx.betweenness_centrality_subset(G, sources, list(G), normalized=False)
+
+
+def _closeness_chunk(G, nodes):
+    return {node: nx.closeness_centrality(G, u=node) for node in nodes}
+
+
+def _map_chunks(func, G, items, parallel):
+    if not parallel:
+        return [func(G, items)]
+    chunks = _chunks(items, _workers())
+    return list(_executor().map(func, [G] * len(chunks), chunks))
+
+
+def betweenness_centrality(G, k=None, seed=42, parallel=None):
+    """Normalized betweenness, accumulated over source-node chunks.
+
+    With ``k`` only ``k`` randomly sampled sources are used and the result is
+    scaled up by ``n / k``, trading accuracy for speed on large graphs.
+    """
+    n = len(G)
+    if n < 3:
+        return dict.fromkeys(G, 0.0)
+    if parallel is None:
+        parallel = n >= PARALLEL_THRESHOLD and _workers() > 1
+
+    sources = list(G)
+    if k is not None and k < n:
+        sources = random.Random(seed).sample(sources, k)
+
+    totals = dict.fromkeys(G, 0.0)
+    for partial in _map_chunks(_betweenness_chunk, G, sources, parallel):
+        for node, value in partial.items():
+            totals[node] += value
+
+    # betweenness_centrality_subset halves undirected pair counts; normalize to
+    # match nx.betweenness_centrality(G, normalized=True).
+    scale = (1 if G.is_directed() else 2) / ((n - 1) * (n - 2)) * n / len(sources)
+    return {node: value * scale for node, value in totals.items()}
+
+
+def closeness_centrality(G, parallel=None):
+    if parallel is None:
+        parallel = len(G) >= PARALLEL_THRESHOLD and _workers() > 1
+    if not parallel:
+        return nx.closeness_centrality(G)
+    closeness = {}
+    for partial in _map_chunks(_closeness_chunk, G, list(G), parallel):
+        closeness.update(partial)
+    return closeness
+
+
+def eigenvector_centrality(G, nstart=None):
+    """Power iteration, falling back to a symmetric sparse eigensolver when it doesn't converge.
+
+    Graphs made of near-identical loosely joined parts have almost equal top
+    eigenvalues, and power iteration stalls on them.
+    """
+    try:
+        return nx.eigenvector_centrality(G, max_iter=1000, nstart=nstart)
+    except nx.PowerIterationFailedConvergence:
+        nodes = list(G)
+        adjacency = nx.to_scipy_sparse_array(G, nodelist=nodes, weight=None, dtype=float)
+        _, vectors = eigsh(adjacency, k=1, which="LA")
+        vector = np.abs(vectors[:, 0])
+        return dict(zip(nodes, (vector / np.linalg.norm(vector)).tolist()))
+
+
+def centrality_metrics(G, k=None, key=None):
+    """Degree, betweenness, closeness and eigenvector centrality, cached by graph content.
+
+    ``key`` is the graph's :func:`graph_hash`, when the caller already has it.
+    """
+
+    def compute():
+        return pd.DataFrame({
+            "Degree": pd.Series(nx.degree_centrality(G)),
+            "Betweenness": pd.Series(betweenness_centrality(G, k=k)),
+            "Closeness": pd.Series(closeness_centrality(G)),
+            "Eigenvector": pd.Series(eigenvector_centrality(G)),
+        }).sort_values("Degree", ascending=False)
+
+    return _cached(("metrics", key or graph_hash(G), k), compute)
+
+
+def edge_changes(old, new):
+    """Edges added to and removed from ``old`` to get ``new``."""
+    added = [(u, v) for u, v in new.edges() if not old.has_edge(u, v)]
+    removed = [(u, v) for u, v in old.edges() if not new.has_edge(u, v)]
+    return added, removed
+
+
+def partition_hash(communities):
+    """Content hash of a partition, independent of community and node order."""
+    lines = sorted("\t".join(sorted(map(repr, community))) for community in communities)
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()
+
+
+def communities(G, key=None, engine=community_detection.DEFAULT_ENGINE, history=None):
+    """Communities of ``G``, cached by graph content and engine.
+
+    ``history`` is a dict the caller keeps per session for a graph it edits.
+    The last graph and its communities are recorded there, and when the next
+    graph differs by only a few edges, only the communities those edges touch
+    are re-detected. Those results depend on the edit history, so they stay
+    out of the shared caches.
+    """
+    key = key or graph_hash(G)
+    if history is None:
+        return _cached(("communities", key, engine), lambda: community_detection.detect(G, engine))
+    last = history.get(engine)
+    if last is not None and last[0] == key:
+        return last[2]
+    found = None
+    if last is not None:
+        _, old_graph, old_communities = last
+        added, removed = edge_changes(old_graph, G)
+        if len(added) + len(removed) <= INCREMENTAL_LIMIT * max(G.number_of_edges(), 1):
+            found = community_detection.update(G, old_communities, added, removed, engine)
+    if found is None:
+        found = communities(G, key, engine)
+    # A copy: edited graphs change in place, and comparing a graph with itself
+    # would find no edits to re-detect.
+    history[engine] = (key, G.copy(), found)
+    return found
@@ -2,8 +2,15 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from pathlib import Path
+import analytics
+import data_loader
+import instrumentation
+import salary_feed
 import utils
+from binning import bar_trace, box_trace
+from chart_units import ChartUnit, build_figures
+from data_preview import data_preview
+from filter_index import FilterIndex
 
 COLOR_THEMES = {
     "Ocean Blue": {
@@ -33,6 +40,10 @@ COLOR_THEMES = {
     },
 }
 
+FILTER_COLUMNS = ["experience_level", "work_year", "remote_ratio"]
+
+instrumentation.begin("EDA Gallery")
+
 st.set_page_config(
     page_title="EDA Gallery - Developer Salaries | Professional Portfolio",
     page_icon="💎",
@@ -45,105 +56,47 @@ st.caption(
     "to answer key questions from the 5E Data Questioning Cycle."
 )
 
-data_path = Path(__file__).parent.parent / "data" / "developer-salary.csv"
-
-try:
-    df = pd.read_csv(data_path)
-except Exception as e:
-    st.error(f"Could not load data: {e}")
-    st.info(f"Looking for CSV at: {data_path}")
-    st.stop()
-
-# Sidebar controls
-with st.sidebar:
-    st.header("🎨 Visualization Settings")
-    color_theme = st.selectbox(
-        "Color theme",
-        options=list(COLOR_THEMES.keys()),
-        index=0,
-    )
-    theme = COLOR_THEMES[color_theme]
-
-    st.divider()
-    st.header("📊 Data filters")
-
-    exp_options = sorted(df["experience_level"].unique())
-    selected_experience = st.multiselect(
-        "Experience level",
-        options=exp_options,
-        default=[],
-        help="Filter by experience level codes (EN, MI, SE, EX)",
-    )
-
-    year_options = sorted(df["work_year"].unique())
-    selected_years = st.multiselect(
-        "Work year",
-        options=year_options,
-        default=[],
-    )
-
-    remote_options = sorted(df["remote_ratio"].unique())
-    remote_display = ["All"] + [str(r) for r in remote_options]
-    selected_remote = st.selectbox(
-        "Remote ratio",
-        options=remote_display,
-        index=0,
-        help="Filter by remote ratio (0 = on-site, 50 = hybrid, 100 = fully remote)",
+# The preview is the only part of the page that reads rows, so the frame and
+# its filter index are loaded once it is opened, from a single snapshot.
+def preview_data(filters):
+    _, frame, filter_index = data_loader.load_snapshot(
+        "developer-salary",
+        [("filter_index", lambda frame: FilterIndex(frame, FILTER_COLUMNS))],
     )
+    return frame, filter_index.select(filters)
 
-df_filtered = df.copy()
-if selected_experience:
-    df_filtered = df_filtered[df_filtered["experience_level"].isin(selected_experience)]
-if selected_years:
-    df_filtered = df_filtered[df_filtered["work_year"].isin(selected_years)]
-if selected_remote != "All":
-    df_filtered = df_filtered[df_filtered["remote_ratio"] == int(selected_remote)]
 
-st.markdown("---")
-
-row1_col1, row1_col2 = st.columns(2)
-
-with row1_col1:
-    st.subheader("1. Salary by experience level")
-    
-    fig = px.box(
-        df_filtered,
-        x="experience_level",
-        y="salary_in_usd",
-        points=False,
+# Chart builders take the salary cube and only the filters they read, and
+# return unthemed figures; the matching style functions apply the selected
+# color theme afterwards.
+def salary_by_level(salary_cube, filters):
+    fig = go.Figure(box_trace(analytics.salary_box_stats(salary_cube, filters), None))
+    fig.update_layout(
         title="Salary by experience level",
-        labels={
-            "experience_level": "Level of professional experience (e.g., junior, mid, senior)",
-            "salary_in_usd": "Salary (USD)",
-        },
-        color_discrete_sequence=[theme["primary"]],
+        xaxis_title="Level of professional experience (e.g., junior, mid, senior)",
+        yaxis_title="Salary (USD)",
     )
     fig.update_layout(
         showlegend=False,
         yaxis_tickformat="$,.0f",
         hovermode="closest",
     )
-    st.plotly_chart(fig, use_container_width=True)
-    
-    st.markdown(
-        """
-        **Insight:** Median salaries rise consistently from entry-level to executive roles. However, senior positions exhibit significantly wider salary ranges and more extreme outliers compared to the tighter clustering seen in entry-level roles.
-        """
-    )
+    return fig
 
-with row1_col2:
-    st.subheader("2. Distribution of salaries")
-    
-    fig = px.histogram(
-        df_filtered,
-        x="salary_in_usd",
-        nbins=40,
+
+def salary_distribution(salary_cube, filters):
+    edges, bin_counts, median_salary = analytics.salary_histogram(salary_cube, filters, nbins=40)
+    fig = go.Figure(bar_trace(edges, bin_counts, None))
+    fig.update_traces(
+        hovertemplate="Salary (USD)=%{customdata[0]:$,.0f} - %{customdata[1]:$,.0f}<br>Count=%{y}<extra></extra>",
+    )
+    fig.update_layout(
         title="Distribution of salaries",
-        labels={"salary_in_usd": "Salary (USD)"},
-        color_discrete_sequence=[theme["primary"]],
+        xaxis_title="Salary (USD)",
+        bargap=0,
+        showlegend=False,
     )
 
-    median_salary = df_filtered["salary_in_usd"].median()
     fig.add_vline(
         x=median_salary,
         line_dash="dash",
@@ -157,26 +110,12 @@ with row1_col2:
         xaxis_tickformat="$,.0f",
         hovermode="x unified",
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-    st.markdown(
-        """
-        **Insight:** The salary distribution is right-skewed, indicating that while most roles cluster around the median, there is a long tail of high-earning outliers that extend significantly beyond the typical range.
-        """
-    )
 
-row2_col1, row2_col2 = st.columns(2)
-
-with row2_col1:
-    st.subheader("3. Salary over time")
-    
-    medians = (
-        df_filtered
-        .groupby("work_year")["salary_in_usd"]
-        .median()
-        .sort_index()
-        .reset_index()
-    )
+def salary_over_time(salary_cube, filters):
+    years, medians = analytics.median_salary_by_year(salary_cube, filters)
+    medians = pd.DataFrame({"work_year": years, "salary_in_usd": medians})
 
     fig = px.line(
         medians,
@@ -185,7 +124,6 @@ with row2_col1:
         markers=True,
         title="Salary over time (median salary by year)",
         labels={"work_year": "Work year", "salary_in_usd": "Median salary (USD)"},
-        color_discrete_sequence=[theme["secondary"]],
     )
 
     fig.update_traces(name="Median salary", hovertemplate="Year=%{x}<br>Median=%{y:$,.0f}")
@@ -193,26 +131,12 @@ with row2_col1:
         hovermode="x unified",
         yaxis_tickformat="$,.0f",
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-    st.markdown(
-        """
-        **Insight:** Median salaries have shown a steady upward trend over the years, reflecting overall market growth, though the rate of increase appears to be stabilizing in the most recent data points.
-        """
-    )
 
-with row2_col2:
-    st.subheader("4. Remote vs on-site roles in 2024")
-    
-    df_2024 = df_filtered[df_filtered["work_year"] == 2024]
-    df_remote = df_2024[df_2024["remote_ratio"].isin([0, 100])].copy()
-    counts = (
-        df_remote
-        .groupby("remote_ratio")
-        .size()
-        .reset_index(name="count")
-        .sort_values("remote_ratio")
-    )
+def remote_vs_onsite(salary_cube, filters):
+    ratios, counts = analytics.remote_onsite_counts(salary_cube, filters, year=2024)
+    counts = pd.DataFrame({"remote_ratio": ratios, "count": counts})
 
     fig = px.bar(
         counts,
@@ -220,33 +144,174 @@ with row2_col2:
         y="count",
         title="Remote vs on-site roles in 2024",
         labels={"remote_ratio": "Remote ratio", "count": "Number of roles"},
-        color_discrete_sequence=[theme["primary"]],
     )
 
     fig.update_traces(
         hovertemplate="Remote ratio=%{x}<br>Count=%{y}",
     )
     fig.update_layout(hovermode="x unified")
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
 
+def primary_markers(fig, theme):
+    fig.update_traces(marker_color=theme["primary"])
+
+
+def secondary_line(fig, theme):
+    fig.update_traces(line_color=theme["secondary"], marker_color=theme["secondary"])
+
+
+CHARTS = {
+    unit.chart: unit
+    for unit in (
+        ChartUnit("salary-by-level", tuple(FILTER_COLUMNS), salary_by_level, primary_markers),
+        ChartUnit("salary-distribution", tuple(FILTER_COLUMNS), salary_distribution, primary_markers),
+        ChartUnit("salary-over-time", tuple(FILTER_COLUMNS), salary_over_time, secondary_line),
+        ChartUnit("remote-vs-onsite", tuple(FILTER_COLUMNS), remote_vs_onsite, primary_markers),
+    )
+}
+
+
+def show_chart(chart, figures):
+    with instrumentation.stage(f"send {chart}"):
+        st.plotly_chart(figures[chart], width="stretch")
+
+
+# Settings, filters and charts rerun together as a fragment, so changing a
+# widget skips the page header. Inside it, charts whose filters are unchanged
+# come from the figure cache and are only re-themed.
+@st.fragment
+@instrumentation.fragment_run("EDA Gallery (fragment)")
+def gallery():
+    # Looked up on every fragment rerun, so open sessions pick up a swapped-in
+    # data file; with the watcher running this is a dict lookup.
+    try:
+        with instrumentation.stage("load") as record:
+            # Streamed from the CSV into persisted aggregates: only rows appended
+            # since the last load are read, and the charts and filters never need
+            # the full frame.
+            data_version, salary_cube = data_loader.load_streamed(
+                "developer-salary", "salary_cube", salary_feed.update_cube
+            )
+            record["rows_out"] = int(salary_cube.counts.sum())
+    except Exception as e:
+        st.error(f"Could not load data: {e}")
+        st.info(f"Looking for CSV at: {data_loader.dataset_path('developer-salary')}")
+        st.stop()
+
+    reload_error = data_loader.reload_error("developer-salary")
+    if reload_error:
+        st.warning(f"A newer version of the data file could not be loaded, showing the previous one: {reload_error}")
+
+    with st.sidebar:
+        st.header("🎨 Visualization Settings")
+        color_theme = st.selectbox(
+            "Color theme",
+            options=list(COLOR_THEMES.keys()),
+            index=0,
+        )
+        theme = COLOR_THEMES[color_theme]
+
+        st.divider()
+        st.header("📊 Data filters")
+
+        exp_options = salary_cube.values("experience_level")
+        selected_experience = st.multiselect(
+            "Experience level",
+            options=exp_options,
+            default=[],
+            help="Filter by experience level codes (EN, MI, SE, EX)",
+        )
+
+        year_options = salary_cube.values("work_year")
+        selected_years = st.multiselect(
+            "Work year",
+            options=year_options,
+            default=[],
+        )
+
+        remote_options = salary_cube.values("remote_ratio")
+        remote_display = ["All"] + [str(r) for r in remote_options]
+        selected_remote = st.selectbox(
+            "Remote ratio",
+            options=remote_display,
+            index=0,
+            help="Filter by remote ratio (0 = on-site, 50 = hybrid, 100 = fully remote)",
+        )
+
+    filters = analytics.salary_filters(
+        selected_experience,
+        selected_years,
+        None if selected_remote == "All" else int(selected_remote),
+    )
+    with instrumentation.stage("filter", rows_in=int(salary_cube.counts.sum())) as record:
+        record["rows_out"] = salary_cube.count(filters)
+
+    # Every chart is built up front on the chart thread pool, then placed in
+    # layout order below.
+    with instrumentation.stage("charts"):
+        figures = build_figures(list(CHARTS.values()), "eda-gallery", salary_cube, filters, theme, data_version)
+
+    st.markdown("---")
+
+    row1_col1, row1_col2 = st.columns(2)
+
+    with row1_col1:
+        st.subheader("1. Salary by experience level")
+        show_chart("salary-by-level", figures)
+
+        st.markdown(
+            """
+            **Insight:** Median salaries rise consistently from entry-level to executive roles. However, senior positions exhibit significantly wider salary ranges and more extreme outliers compared to the tighter clustering seen in entry-level roles.
+            """
+        )
+
+    with row1_col2:
+        st.subheader("2. Distribution of salaries")
+        show_chart("salary-distribution", figures)
+
+        st.markdown(
+            """
+            **Insight:** The salary distribution is right-skewed, indicating that while most roles cluster around the median, there is a long tail of high-earning outliers that extend significantly beyond the typical range.
+            """
+        )
+
+    row2_col1, row2_col2 = st.columns(2)
+
+    with row2_col1:
+        st.subheader("3. Salary over time")
+        show_chart("salary-over-time", figures)
+
+        st.markdown(
+            """
+            **Insight:** Median salaries have shown a steady upward trend over the years, reflecting overall market growth, though the rate of increase appears to be stabilizing in the most recent data points.
+            """
+        )
+
+    with row2_col2:
+        st.subheader("4. Remote vs on-site roles in 2024")
+        show_chart("remote-vs-onsite", figures)
+
+        st.markdown(
+            """
+            **Insight:** In 2024, the data highlights a distinct split between fully remote and fully on-site roles, illustrating the continued prevalence and viability of remote work arrangements in the industry.
+            """
+        )
+
+    st.markdown("---")
     st.markdown(
         """
-        **Insight:** In 2024, the data highlights a distinct split between fully remote and fully on-site roles, illustrating the continued prevalence and viability of remote work arrangements in the industry.
+        ### Data Source
+        - **Dataset Name:** Data Developer Salary in 2024
+        - **Source Link:** https://www.kaggle.com/datasets/shahzadi786/111111111111111111111
+        - **Last Updated:** 2025-11-14
+        - **Number of Rows:** 16534
         """
     )
+    data_preview(lambda: preview_data(filters), key="salary-preview")
 
-st.markdown("---")
-st.markdown(
-    """
-    ### Data Source
-    - **Dataset Name:** Data Developer Salary in 2024
-    - **Source Link:** https://www.kaggle.com/datasets/shahzadi786/111111111111111111111
-    - **Last Updated:** 2025-11-14
-    - **Number of Rows:** 16534
-    """
-)
-with st.expander("Data Preview"):
-    st.dataframe(df)
+
+gallery()
 
 utils.render_footer()
 
@@ -1,8 +1,14 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from pathlib import Path
+import plotly.graph_objects as go
+import analytics
+import data_loader
+import instrumentation
 import utils
+from binning import heatmap_trace
+from chart_units import ChartUnit, build_figures
+from data_preview import data_preview
+from filter_index import FilterIndex, apply_filters
+from large_scatter import recolor_groups, scatter_figure, scatter_mode
 
 COLOR_THEMES = {
     "Ocean Blue": {
@@ -32,6 +38,21 @@ COLOR_THEMES = {
     },
 }
 
+# Only the columns the charts and filters below actually use are loaded.
+DATA_COLUMNS = [
+    "Admission grade",
+    "Curricular units 1st sem (enrolled)",
+    "Curricular units 1st sem (approved)",
+    "Curricular units 1st sem (grade)",
+    "Curricular units 2nd sem (enrolled)",
+    "Curricular units 2nd sem (approved)",
+    "Age at enrollment",
+    "Target",
+]
+FILTER_COLUMNS = ["Target", "Age at enrollment"]
+
+instrumentation.begin("Dashboard")
+
 st.set_page_config(
     page_title="Student Performance Dashboard | Professional Portfolio",
     page_icon="💎",
@@ -39,58 +60,6 @@ st.set_page_config(
 )
 st.title("Student Performance Factors")
 
-data_path = Path(__file__).parent.parent / "data" / "student-dropout-risk.csv"
-
-try:
-    df = pd.read_csv(data_path, sep=";")
-except Exception as e:
-    st.error(f"Could not load data: {e}")
-    st.info(f"Looking for data at: {data_path}")
-    st.stop()
-
-# Sidebar controls
-with st.sidebar:
-    st.header("🎨 Visualization Settings")
-    color_theme = st.selectbox(
-        "Color theme",
-        options=list(COLOR_THEMES.keys()),
-        index=0,
-    )
-    theme = COLOR_THEMES[color_theme]
-
-    st.divider()
-    st.header("📊 Filter students")
-
-    target_options = sorted(df["Target"].unique()) if "Target" in df.columns else []
-    selected_targets = st.multiselect(
-        "Outcome",
-        options=target_options,
-        default=[],
-        help="Filter by final outcome (Graduate, Enrolled, Dropout)",
-    )
-
-    age_col = "Age at enrollment"
-    if age_col in df.columns:
-        min_age = int(df[age_col].min())
-        max_age = int(df[age_col].max())
-        selected_age_range = st.slider(
-            "Age at enrollment",
-            min_value=min_age,
-            max_value=max_age,
-            value=(min_age, max_age),
-        )
-    else:
-        selected_age_range = None
-
-df_filtered = df.copy()
-if selected_targets:
-    df_filtered = df_filtered[df_filtered["Target"].isin(selected_targets)]
-if selected_age_range is not None:
-    df_filtered = df_filtered[
-        (df_filtered[age_col] >= selected_age_range[0])
-        & (df_filtered[age_col] <= selected_age_range[1])
-    ]
-
 st.markdown(
     """
     Dashboard exploring how admission grades, course progress, and economic context relate to
@@ -101,139 +70,244 @@ st.markdown(
     """
 )
 
-st.divider()
-# ROW 1: performance vs admission
-col1_r1, col2_r1 = st.columns([2, 1])
 
-with col1_r1:
-    st.subheader("Admission grade vs first-semester performance")
-    st.caption("Each point is a student; color shows final outcome.")
+# The preview shows every column, not just the ones the charts load, so it
+# reads the full frame (and an index over it) once it is opened.
+def preview_data(filters):
+    _, frame, preview_index = data_loader.load_snapshot(
+        "student-dropout-risk",
+        [("preview_index", lambda frame: FilterIndex(frame, FILTER_COLUMNS))],
+    )
+    return frame, preview_index.select(filters)
 
-    for col in [
-        "Admission grade",
-        "Curricular units 1st sem (grade)",
-    ]:
-        if col not in df_filtered.columns:
-            st.error(f"Expected column '{col}' not found in data.")
-            st.stop()
 
-    fig = px.scatter(
+# Chart builders take the page's data (frame and filter index) and only the
+# filters they read, and return unthemed figures; the matching style functions
+# apply the selected color theme afterwards.
+def grade_scatter(data, filters):
+    df, filter_index = data
+    df_filtered = apply_filters(df, filter_index, filters)
+    fig = scatter_figure(
         df_filtered,
         x="Admission grade",
         y="Curricular units 1st sem (grade)",
         color="Target",
-        opacity=0.5,
         labels={
             "Admission grade": "Admission grade",
             "Curricular units 1st sem (grade)": "1st-semester average grade",
             "Target": "Outcome",
         },
         title="Higher admission grades tend to align with stronger first-semester performance",
-        color_discrete_sequence=[theme["primary"], theme["secondary"]],
     )
     fig.update_layout(legend_title_text="Outcome")
-    st.plotly_chart(fig, use_container_width=True)
-
-with col2_r1:
-    st.subheader("How to read this dashboard")
-    st.write(
-        "This dashboard summarizes a student dropout-risk dataset. The first chart shows how "
-        "admission grades relate to first-semester performance, broken down by final outcome. "
-        "Use it to see whether higher starting preparation appears to protect against dropout."
+    return fig
+
+
+def first_semester_progress(data, filters):
+    df, filter_index = data
+    x_edges, y_edges, bin_counts = analytics.semester_progress(df, filter_index, filters, semester=1, nbins=10)
+    fig = go.Figure(heatmap_trace(x_edges, y_edges, bin_counts, None))
+    fig.update_traces(
+        hovertemplate="Units enrolled (1st sem)=%{x}<br>Units approved (1st sem)=%{y}<br>count=%{z}<extra></extra>",
     )
+    fig.update_layout(
+        title="Where students cluster by enrollment vs approvals",
+        xaxis_title="Units enrolled (1st sem)",
+        yaxis_title="Units approved (1st sem)",
+    )
+    return fig
+
+
+def second_semester_progress(data, filters):
+    df, filter_index = data
+    x_edges, y_edges, bin_counts = analytics.semester_progress(df, filter_index, filters, semester=2, nbins=10)
+    fig = go.Figure(heatmap_trace(x_edges, y_edges, bin_counts, None))
+    fig.update_traces(
+        hovertemplate="Units enrolled (2nd sem)=%{x}<br>Units approved (2nd sem)=%{y}<br>count=%{z}<extra></extra>",
+    )
+    fig.update_layout(
+        title="Where students cluster in the 2nd semester",
+        xaxis_title="Units enrolled (2nd sem)",
+        yaxis_title="Units approved (2nd sem)",
+    )
+    return fig
+
+
+def outcome_colors(fig, theme):
+    recolor_groups(fig, [theme["primary"], theme["secondary"]])
+
+
+def heatmap_colors(fig, theme):
+    fig.update_traces(colorscale=theme["heatmap"])
+
+
+CHARTS = {
+    unit.chart: unit
+    for unit in (
+        ChartUnit("admission-vs-first-semester", tuple(FILTER_COLUMNS), grade_scatter, outcome_colors),
+        ChartUnit("first-semester-progress", tuple(FILTER_COLUMNS), first_semester_progress, heatmap_colors),
+        ChartUnit("second-semester-progress", tuple(FILTER_COLUMNS), second_semester_progress, heatmap_colors),
+    )
+}
+
+
+def show_chart(chart, figures):
+    with instrumentation.stage(f"send {chart}"):
+        st.plotly_chart(figures[chart], width="stretch")
+
 
-st.divider()
-# ROW 2: heatmaps of course progress
-col1_r2, col3_r2 = st.columns(2)
-
-with col1_r2:
-    st.subheader("1st-semester progress")
-    st.caption("Relationship between enrolled and approved units in the 1st semester.")
-
-    col_enrolled = "Curricular units 1st sem (enrolled)"
-    col_approved = "Curricular units 1st sem (approved)"
-    if col_enrolled in df_filtered.columns and col_approved in df_filtered.columns:
-        fig = px.density_heatmap(
-            df_filtered,
-            x=col_enrolled,
-            y=col_approved,
-            nbinsx=10,
-            nbinsy=10,
-            labels={
-                col_enrolled: "Units enrolled (1st sem)",
-                col_approved: "Units approved (1st sem)",
-            },
-            title="Where students cluster by enrollment vs approvals",
-            color_continuous_scale=theme["heatmap"],
+# Settings, filters and charts rerun together as a fragment, so changing a
+# widget skips the page header. Inside it, charts whose filters are unchanged
+# come from the figure cache and are only re-themed.
+@st.fragment
+@instrumentation.fragment_run("Dashboard (fragment)")
+def dashboard():
+    # Looked up on every fragment rerun, so open sessions pick up a swapped-in
+    # data file; with the watcher running these are dict lookups.
+    try:
+        with instrumentation.stage("load") as record:
+            # One snapshot read, so the frame, its index and the version that
+            # keys the figure cache always belong together.
+            data_version, df, filter_index = data_loader.load_snapshot(
+                "student-dropout-risk",
+                [("filter_index", lambda frame: FilterIndex(frame, FILTER_COLUMNS))],
+                columns=DATA_COLUMNS,
+            )
+            record["rows_out"] = len(df)
+    except Exception as e:
+        st.error(f"Could not load data: {e}")
+        st.info(f"Looking for data at: {data_loader.dataset_path('student-dropout-risk')}")
+        st.stop()
+
+    reload_error = data_loader.reload_error("student-dropout-risk")
+    if reload_error:
+        st.warning(f"A newer version of the data file could not be loaded, showing the previous one: {reload_error}")
+
+    with st.sidebar:
+        st.header("🎨 Visualization Settings")
+        color_theme = st.selectbox(
+            "Color theme",
+            options=list(COLOR_THEMES.keys()),
+            index=0,
         )
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.error("Expected 1st-semester curricular unit columns not found in data.")
-
-# with col2_r2:
-#     st.subheader("Outcome mix by economic context")
-#     st.caption("How outcomes vary across unemployment-rate bands.")
-
-#     if "Unemployment rate" in df_filtered.columns and "Target" in df_filtered.columns:
-#         df_bins = df_filtered.copy()
-#         df_bins["Unemployment band"] = pd.cut(
-#             df_bins["Unemployment rate"], bins=4, precision=1
-#         )
-#         counts = (
-#             df_bins.groupby(["Unemployment band", "Target"])
-#             .size()
-#             .reset_index(name="count")
-#         )
-#         counts["Unemployment band"] = counts["Unemployment band"].astype(str)
-#         fig = px.bar(
-#             counts,
-#             x="Unemployment band",
-#             y="count",
-#             color="Target",
-#             labels={"count": "Number of students", "Unemployment band": "Unemployment rate band"},
-#             title="Student outcomes across unemployment-rate bands",
-#             color_discrete_sequence=[theme["primary"], theme["secondary"]],
-#         )
-#         fig.update_layout(xaxis_tickangle=-30)
-#         st.plotly_chart(fig, use_container_width=True)
-#     else:
-#         st.error("Expected 'Unemployment rate' or 'Target' columns not found in data.")
-
-with col3_r2:
-    st.subheader("2nd-semester progress")
-    st.caption("Relationship between enrolled and approved units in the 2nd semester.")
-
-    col_enrolled_2 = "Curricular units 2nd sem (enrolled)"
-    col_approved_2 = "Curricular units 2nd sem (approved)"
-    if col_enrolled_2 in df_filtered.columns and col_approved_2 in df_filtered.columns:
-        fig = px.density_heatmap(
-            df_filtered,
-            x=col_enrolled_2,
-            y=col_approved_2,
-            nbinsx=10,
-            nbinsy=10,
-            labels={
-                col_enrolled_2: "Units enrolled (2nd sem)",
-                col_approved_2: "Units approved (2nd sem)",
-            },
-            title="Where students cluster in the 2nd semester",
-            color_continuous_scale=theme["heatmap"],
+        theme = COLOR_THEMES[color_theme]
+
+        st.divider()
+        st.header("📊 Filter students")
+
+        target_options = filter_index.values("Target")
+        selected_targets = st.multiselect(
+            "Outcome",
+            options=target_options,
+            default=[],
+            help="Filter by final outcome (Graduate, Enrolled, Dropout)",
         )
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.error("Expected 2nd-semester curricular unit columns not found in data.")
 
-st.markdown("---")
-st.markdown(
-    """
-    ### Data Source
-    - **Dataset Name:** Predict Students' Dropout and Academic Success
-    - **Source Link:** https://archive.ics.uci.edu/dataset/697/predict+students+dropout+and+academic+success
-    - **Last Updated:** 12-12-2021
-    - **Number of Rows:** 4424
-    """
-)
-with st.expander("Data Preview"):
-    st.dataframe(df)
+        age_col = "Age at enrollment"
+        age_options = filter_index.values(age_col)
+        min_age = age_options[0]
+        max_age = age_options[-1]
+        selected_age_range = st.slider(
+            "Age at enrollment",
+            min_value=min_age,
+            max_value=max_age,
+            value=(min_age, max_age),
+        )
+
+    filters = analytics.student_filters(
+        selected_targets,
+        analytics.ages_in_range(age_options, selected_age_range),
+    )
+    with instrumentation.stage("filter", rows_in=len(df)) as record:
+        positions = filter_index.select(filters)
+        n_filtered = len(df) if positions is None else len(positions)
+        record["rows_out"] = n_filtered
+
+    # Every chart is built up front on the chart thread pool, then placed in
+    # layout order below.
+    with instrumentation.stage("charts"):
+        figures = build_figures(list(CHARTS.values()), "dashboard", (df, filter_index), filters, theme, data_version)
+
+    st.divider()
+    # ROW 1: performance vs admission
+    col1_r1, col2_r1 = st.columns([2, 1])
+
+    with col1_r1:
+        st.subheader("Admission grade vs first-semester performance")
+        if scatter_mode(n_filtered) == "density":
+            st.caption(
+                "Contours show where students cluster; color shows final outcome. "
+                "Hover points are a representative sample."
+            )
+        else:
+            st.caption("Each point is a student; color shows final outcome.")
+
+        show_chart("admission-vs-first-semester", figures)
+
+    with col2_r1:
+        st.subheader("How to read this dashboard")
+        st.write(
+            "This dashboard summarizes a student dropout-risk dataset. The first chart shows how "
+            "admission grades relate to first-semester performance, broken down by final outcome. "
+            "Use it to see whether higher starting preparation appears to protect against dropout."
+        )
+
+    st.divider()
+    # ROW 2: heatmaps of course progress
+    col1_r2, col3_r2 = st.columns(2)
+
+    with col1_r2:
+        st.subheader("1st-semester progress")
+        st.caption("Relationship between enrolled and approved units in the 1st semester.")
+        show_chart("first-semester-progress", figures)
+
+    # with col2_r2:
+    #     st.subheader("Outcome mix by economic context")
+    #     st.caption("How outcomes vary across unemployment-rate bands.")
+
+    #     if "Unemployment rate" in df_filtered.columns and "Target" in df_filtered.columns:
+    #         df_bins = df_filtered.copy()
+    #         df_bins["Unemployment band"] = pd.cut(
+    #             df_bins["Unemployment rate"], bins=4, precision=1
+    #         )
+    #         counts = (
+    #             df_bins.groupby(["Unemployment band", "Target"])
+    #             .size()
+    #             .reset_index(name="count")
+    #         )
+    #         counts["Unemployment band"] = counts["Unemployment band"].astype(str)
+    #         fig = px.bar(
+    #             counts,
+    #             x="Unemployment band",
+    #             y="count",
+    #             color="Target",
+    #             labels={"count": "Number of students", "Unemployment band": "Unemployment rate band"},
+    #             title="Student outcomes across unemployment-rate bands",
+    #             color_discrete_sequence=[theme["primary"], theme["secondary"]],
+    #         )
+    #         fig.update_layout(xaxis_tickangle=-30)
+    #         st.plotly_chart(fig, use_container_width=True)
+    #     else:
+    #         st.error("Expected 'Unemployment rate' or 'Target' columns not found in data.")
+
+    with col3_r2:
+        st.subheader("2nd-semester progress")
+        st.caption("Relationship between enrolled and approved units in the 2nd semester.")
+        show_chart("second-semester-progress", figures)
+
+    st.markdown("---")
+    st.markdown(
+        """
+        ### Data Source
+        - **Dataset Name:** Predict Students' Dropout and Academic Success
+        - **Source Link:** https://archive.ics.uci.edu/dataset/697/predict+students+dropout+and+academic+success
+        - **Last Updated:** 12-12-2021
+        - **Number of Rows:** 4424
+        """
+    )
+    data_preview(lambda: preview_data(filters), key="students-preview")
+
+
+dashboard()
 
 utils.render_footer()
\ No newline at end of file
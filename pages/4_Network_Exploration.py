@@ -1,10 +1,20 @@
+import heapq
+
 import streamlit as st
 import networkx as nx
 import matplotlib.pyplot as plt
 from anytree import Node, RenderTree
-from networkx.algorithms.community import greedy_modularity_communities
-import pandas as pd
+import analytics
+import community_detection
+import edge_lists
+import figure_cache
+import graph_layout
+import instrumentation
+import network_metrics
 import utils
+from incremental_centrality import IncrementalCentrality
+
+instrumentation.begin("Network Exploration")
 
 st.set_page_config(
     page_title="Network Analysis | Friendship Graph",
@@ -15,28 +25,153 @@ st.set_page_config(
 st.title("Lab Exploration: Network Analysis")
 st.divider()
 
-G = nx.Graph()
-G.add_edges_from([
-    ("Alice","Bob"),("Alice","Charlie"),("Bob","Charlie"),("Charlie","Diana"),
-    ("Diana","Eve"),("Bob","Diana"),("Frank","Eve"),("Eve","Ian"),
-    ("Diana","Ian"),("Ian","Grace"),("Grace","Hannah"),("Hannah","Jack"),
-    ("Grace","Jack"),("Charlie","Frank"),("Alice","Eve"),("Bob","Jack")
-])
-
-# Detailed Analysis Calculations 
-degree = nx.degree_centrality(G)
-betweenness = nx.betweenness_centrality(G)
-closeness = nx.closeness_centrality(G)
-eigenvector = nx.eigenvector_centrality(G, max_iter=1000)
-df_metrics = pd.DataFrame({
-    "Degree": pd.Series(degree),
-    "Betweenness": pd.Series(betweenness),
-    "Closeness": pd.Series(closeness),
-    "Eigenvector": pd.Series(eigenvector),
-}).sort_values("Degree", ascending=False)
+GRAPH_TITLES = {
+    "friendship.edges.csv": "Friendship Network in a College Class",
+}
+GRAPH_NOTES = {
+    "friendship.edges.csv": """
+  The network breaks into three tight groups, and Bob sits between them, bridging groups. If the need arose to quickly diseminate information, 
+  Bob would be the fastest route for information. 
+  """,
+}
+
+# The edit selectboxes list at most this many nodes (the best connected); any
+# other name can still be typed in.
+NODE_OPTION_LIMIT = 500
+
+
+def node_options(graph):
+    if graph.number_of_nodes() <= NODE_OPTION_LIMIT:
+        return sorted(graph.nodes(), key=str)
+    top = heapq.nlargest(NODE_OPTION_LIMIT, graph.degree, key=lambda item: item[1])
+    return sorted((node for node, _ in top), key=str)
+
+
+edge_list_paths = edge_lists.available_edge_lists()
+if not edge_list_paths:
+    st.error("No edge lists found.")
+    st.info(f"Looking for *.edges.csv / *.edges.tsv files in: {edge_lists.DATA_DIR}")
+    st.stop()
+
+with st.sidebar:
+    st.header("🕸️ Graph")
+    graph_path = st.selectbox(
+        "Edge list",
+        options=edge_list_paths,
+        format_func=lambda path: path.name,
+        help="CSV/TSV files in data/ named *.edges.csv or *.edges.tsv with source, target and optional weight columns.",
+    )
+
+try:
+    with instrumentation.stage("load") as record:
+        G = edge_lists.load_graph(graph_path)
+        record["nodes"] = G.number_of_nodes()
+        record["edges"] = G.number_of_edges()
+except Exception as e:
+    st.error(f"Could not load graph: {e}")
+    st.info(f"Looking for edge list at: {graph_path}")
+    st.stop()
+
+graph_title = GRAPH_TITLES.get(graph_path.name, graph_path.name)
+
+graph_key = network_metrics.graph_hash(G)
+
+# Edited graphs live in the session, keyed by the hash of the file's graph,
+# so each visitor explores their own "what if" without touching the shared one.
+edited_graphs = st.session_state.setdefault("edited_graphs", {})
+tracker = edited_graphs.get(graph_key)
+# The session's last communities per engine, so edits only re-detect the
+# communities they touch. Reset with the edits, so the file's own graph always
+# gets a full detection.
+community_history = st.session_state.setdefault("community_history", {}).setdefault(graph_key, {})
+
+with st.sidebar:
+    st.header("✏️ What-if Editing")
+    options = node_options(tracker.G if tracker else G)
+    node_help = f"Type any node name; only the {NODE_OPTION_LIMIT} best-connected nodes are listed."
+    edit_source = st.selectbox("Node", options=options, accept_new_options=True, help=node_help)
+    edit_target = st.selectbox(
+        "Other node",
+        options=options,
+        index=min(1, len(options) - 1),
+        accept_new_options=True,
+        help=node_help,
+    )
+    add_col, remove_col = st.columns(2)
+    add_edge = add_col.button("Add edge")
+    remove_edge = remove_col.button("Remove edge")
+    remove_node = st.button(
+        f"Remove {edit_source}" if edit_source is not None else "Remove node",
+        help="Drop the first node and all of its connections, e.g. what if Bob leaves the group.",
+    )
+    reset_edits = st.button("Reset graph", disabled=tracker is None)
+
+if reset_edits:
+    edited_graphs.pop(graph_key, None)
+    community_history.clear()
+    tracker = None
+
+if (add_edge or remove_edge or remove_node) and edit_source is not None:
+    if tracker is None:
+        with st.spinner("Preparing incremental metrics..."):
+            # Starts from the file graph's exact metrics, cached and computed
+            # in parallel, rather than running every shortest-path pass here.
+            tracker = IncrementalCentrality(G, metrics=analytics.graph_metrics(G, key=graph_key))
+        edited_graphs[graph_key] = tracker
+    if add_edge and edit_target is not None:
+        recomputed = tracker.add_edge(edit_source, edit_target)
+    elif remove_edge and edit_target is not None:
+        recomputed = tracker.remove_edge(edit_source, edit_target)
+    else:
+        recomputed = tracker.remove_node(edit_source)
+    st.toast(f"Updated metrics from {recomputed} of {tracker.G.number_of_nodes()} sources")
+
+with st.sidebar:
+    st.header("⚙️ Analysis Settings")
+    approximate = st.toggle(
+        "Approximate betweenness",
+        value=False,
+        help="Sample k source nodes instead of using every node. Useful on very large graphs.",
+        disabled=tracker is not None,
+    )
+    betweenness_k = st.number_input(
+        "Sample size (k)",
+        min_value=1,
+        max_value=max(len(G), 1),
+        value=max(min(len(G), 256), 1),
+        disabled=not approximate or tracker is not None,
+    )
+    community_engine = st.selectbox(
+        "Community algorithm",
+        options=community_detection.available_engines(),
+        index=community_detection.available_engines().index(community_detection.DEFAULT_ENGINE),
+        help="Louvain and label propagation scale to much larger graphs than greedy modularity.",
+    )
+
+# Detailed Analysis Calculations (cached per graph content, or kept up to date
+# incrementally while the graph is being edited)
+with instrumentation.stage("metrics") as record:
+    if tracker is not None:
+        G = tracker.G
+        graph_key = network_metrics.graph_hash(G)
+        df_metrics = tracker.metrics()
+    else:
+        df_metrics = analytics.graph_metrics(
+            G,
+            k=int(betweenness_k) if approximate else None,
+            key=graph_key,
+        )
+    record["rows_out"] = len(df_metrics)
 
 # Community Detection Calculations
-communities = greedy_modularity_communities(G)
+with instrumentation.stage("communities") as record:
+    communities = network_metrics.communities(
+        G,
+        key=graph_key,
+        engine=community_engine,
+        history=community_history,
+    )
+    record["rows_out"] = len(communities)
 
 # Community Visualization Calculations
 st.header("Community Visualization")
@@ -46,49 +181,72 @@ st.markdown("""
 \n
 """)
 
-palette = ["tab:blue", "tab:green", "tab:purple"]
+palette = [
+    "tab:blue", "tab:green", "tab:purple", "tab:orange", "tab:red",
+    "tab:brown", "tab:pink", "tab:olive", "tab:cyan", "tab:gray",
+]
 node_to_comm = {}
 
 for c_index, comm in enumerate(communities):
     for node in comm:
         node_to_comm[node] = c_index
 
-community_colors = [palette[node_to_comm[n] % len(palette)] for n in G.nodes()]
-pos = nx.spring_layout(G, seed=42) 
+def draw_communities():
+    community_colors = [palette[node_to_comm[n] % len(palette)] for n in G.nodes()]
+    pos = graph_layout.graph_layout(G, seed=42, key=graph_key, lineage=graph_path.name)
 
-fig2, ax2 = plt.subplots(figsize=(10, 6))
-nx.draw(
-    G, pos, with_labels=True, node_size=3000,
-    node_color=community_colors, edge_color="gray",
-    font_size=8, font_weight="bold", 
-    ax=ax2
-)
-ax2.set_title(
-    "Friendship Network in a College Class",
-    fontsize=22,
-    fontweight='bold',
-    verticalalignment='bottom',
-    horizontalalignment='center',
-)
+    # Shrink nodes and drop labels as graphs grow so large drawings stay legible.
+    small_graph = G.number_of_nodes() <= 50
+    fig2, ax2 = plt.subplots(figsize=(10, 6))
+    nx.draw(
+        G, pos, with_labels=small_graph,
+        node_size=3000 if small_graph else max(2, 3000 / G.number_of_nodes() ** 0.5),
+        node_color=community_colors, edge_color="gray",
+        width=1.0 if small_graph else 0.2,
+        font_size=8, font_weight="bold", 
+        ax=ax2
+    )
+    ax2.set_title(
+        graph_title,
+        fontsize=22,
+        fontweight='bold',
+        verticalalignment='bottom',
+        horizontalalignment='center',
+    )
+    return fig2
+
+
+# The drawing only depends on the graph, its communities and the title, so
+# repeat views of the same graph reuse the rendered PNG.
+with instrumentation.stage("chart communities"):
+    community_png = figure_cache.cached_png(
+        "network",
+        "communities",
+        {"graph": graph_key, "communities": network_metrics.partition_hash(communities), "title": graph_title},
+        None,
+        None,
+        draw_communities,
+    )
 
 col1, col2 = st.columns(2)
 
 with col1:
   # --- Community Visualization ---
-  st.pyplot(fig2)
-  st.subheader("Friendship Observations")
+  with instrumentation.stage("send"):
+    st.image(community_png, width="stretch")
+  show_notes = tracker is None and graph_path.name in GRAPH_NOTES
+  st.subheader("Friendship Observations" if show_notes else "Observations")
   
   # Identify top nodes
-  most_connected = df_metrics.index[0]
-  most_influential = df_metrics.sort_values("Betweenness", ascending=False).index[0]
+  most_connected, most_influential = analytics.key_nodes(df_metrics)
   
-  st.markdown(f"""
+  if most_connected is None:
+    st.info("The edited graph has no nodes left. Use Reset graph to start over.")
+  else:
+    st.markdown(f"""
   - **Most Connected:** {most_connected} (Highest Degree)
   - **Most Influential:** {most_influential} (Highest Betweenness)
-
-  The network breaks into three tight groups, and Bob sits between them, bridging groups. If the need arose to quickly diseminate information, 
-  Bob would be the fastest route for information. 
-  """)
+  """ + (GRAPH_NOTES[graph_path.name] if show_notes else ""))
 
 with col2:
 # --- Community Detection ---
@@ -96,7 +254,7 @@ with col2:
   st.dataframe(communities)
   # --- Detailed Analysis ---
   st.header("Detailed Analysis")
-  st.dataframe(df_metrics, use_container_width=True)
+  st.dataframe(df_metrics, width="stretch")
 
 
 utils.render_footer()
@@ -0,0 +1,116 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from data_loader import CACHE_ROOT
+
+# Results shared by every app process on the host (figure payloads, network
+# metrics, communities, graph layouts), so a cold worker starts with what the
+# others already computed. Set APP_RESULT_STORE_MB=0 to turn it off.
+STORE_PATH = CACHE_ROOT / "results.sqlite"
+MAX_BYTES = int(float(os.environ.get("APP_RESULT_STORE_MB", 256)) * 1024 * 1024)
+BUSY_TIMEOUT = 5.0
+# Reads refresh an entry's last-used time at most this often, to keep reads
+# from turning into writes.
+TOUCH_INTERVAL = 60.0
+
+_local = threading.local()
+
+
+def _code_version():
+    """Hash of the app's Python sources, so a deploy never serves results built by older code."""
+    digest = hashlib.sha1()
+    root = Path(__file__).parent
+    for path in sorted([*root.glob("*.py"), *root.glob("pages/*.py")]):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+CODE_VERSION = _code_version()
+
+
+def _connection():
+    connection = getattr(_local, "connection", None)
+    if connection is None:
+        STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(STORE_PATH, timeout=BUSY_TIMEOUT, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+        _local.connection = connection
+    return connection
+
+
+def _key(key):
+    return hashlib.sha1(repr((CODE_VERSION, key)).encode()).hexdigest()
+
+
+def get(key):
+    """Bytes stored under ``key`` (any tuple with a stable ``repr``), or ``None``."""
+    if MAX_BYTES <= 0:
+        return None
+    digest = _key(key)
+    now = time.time()
+    try:
+        connection = _connection()
+        row = connection.execute("SELECT value FROM results WHERE key = ?", (digest,)).fetchone()
+        if row is not None:
+            connection.execute(
+                "UPDATE results SET used = ? WHERE key = ? AND used < ?",
+                (now, digest, now - TOUCH_INTERVAL),
+            )
+    except (OSError, sqlite3.Error):
+        # An unwritable or busy store only costs a recompute.
+        return None
+    return None if row is None else bytes(row[0])
+
+
+def put(key, value):
+    """Store ``value`` (bytes), evicting the least recently used entries beyond ``MAX_BYTES``."""
+    if MAX_BYTES <= 0 or len(value) > MAX_BYTES:
+        return
+    try:
+        connection = _connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, used) VALUES (?, ?, ?, ?)",
+                (_key(key), value, len(value), time.time()),
+            )
+            connection.execute(
+                "DELETE FROM results WHERE key IN ("
+                "SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY used DESC) AS total FROM results) "
+                "WHERE total > ?)",
+                (MAX_BYTES,),
+            )
+    except (OSError, sqlite3.Error):
+        pass
+
+
+def get_object(key):
+    # Pickle is fine here: the store lives in the app's own cache directory,
+    # next to the Parquet and aggregate caches it already trusts.
+    payload = get(key)
+    return None if payload is None else pickle.loads(payload)
+
+
+def put_object(key, value):
+    put(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def size():
+    """Total bytes and entries currently stored."""
+    try:
+        total, count = _connection().execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM results").fetchone()
+    except (OSError, sqlite3.Error):
+        return 0, 0
+    return total, count
@@ -0,0 +1,245 @@
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ("experience_level", "work_year", "remote_ratio", "company_size")
+
+# Log-spaced buckets: any quantile read from a sketch is within 0.5% of the
+# true value. Salaries from $1 up to $1B fit in ~2k buckets per cell.
+RELATIVE_ACCURACY = 0.005
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+N_BUCKETS = math.ceil(math.log(1e9) / _LOG_GAMMA) + 1
+# Exact counts in fixed-width bins for the salary histogram: $2k wide up to
+# $2M, with anything above counted in the last bin.
+LINEAR_WIDTH = 2_000
+N_LINEAR = 1_000
+
+
+def bucket_of(values):
+    values = np.maximum(np.asarray(values, dtype=np.float64), 1.0)
+    return np.minimum(np.ceil(np.log(values) / _LOG_GAMMA), N_BUCKETS - 1).astype(np.intp)
+
+
+def linear_bin_of(values):
+    values = np.maximum(np.asarray(values, dtype=np.float64), 0.0)
+    return np.minimum(values // LINEAR_WIDTH, N_LINEAR - 1).astype(np.intp)
+
+
+def bucket_value(buckets):
+    """Representative value of a bucket (within the relative accuracy of every member)."""
+    return 2 * np.power(_GAMMA, buckets) / (_GAMMA + 1)
+
+
+class QuantileSketch:
+    """Mergeable summary of one salary population: bucket counts plus count/sum/min/max."""
+
+    def __init__(self, histogram, linear, count, total, minimum, maximum):
+        self.histogram = histogram
+        self.linear = linear
+        self.count = int(count)
+        self.total = float(total)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+
+    def quantile(self, q):
+        if self.count == 0:
+            return float("nan")
+        if q <= 0:
+            return self.minimum
+        if q >= 1:
+            return self.maximum
+        # Linear interpolation between the two neighbouring ranks, like pandas.
+        rank = q * (self.count - 1)
+        lower, upper = math.floor(rank), math.ceil(rank)
+        buckets = np.searchsorted(np.cumsum(self.histogram), [lower, upper], side="right")
+        low, high = np.clip(bucket_value(buckets), self.minimum, self.maximum)
+        return float(low + (high - low) * (rank - lower))
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def mean(self):
+        return self.total / self.count if self.count else float("nan")
+
+    def binned(self, nbins):
+        """About ``nbins`` bins spanning [minimum, maximum], and their exact counts.
+
+        Bin widths are rounded up to whole ``LINEAR_WIDTH`` steps, so every
+        count is a sum of the fixed-width counts. Salaries past the fixed-width
+        range widen the last bin up to the maximum.
+        """
+        if self.count == 0:
+            counts, edges = np.histogram([], bins=nbins)
+            return edges, counts
+        first, last = linear_bin_of([self.minimum, self.maximum]).tolist()
+        step = -(-(last - first + 1) // nbins)
+        n_bins = -(-(last - first + 1) // step)
+        counts = np.zeros(n_bins * step, np.int64)
+        counts[:last - first + 1] = self.linear[first:last + 1]
+        edges = (first + np.arange(n_bins + 1) * step) * float(LINEAR_WIDTH)
+        edges[-1] = max(edges[-1], self.maximum)
+        return edges, counts.reshape(n_bins, step).sum(axis=1)
+
+    def box_stats(self):
+        """Quartiles and Tukey whisker ends (furthest values within 1.5 IQR of the box)."""
+        q1, median, q3 = self.quantile(0.25), self.median(), self.quantile(0.75)
+        iqr = q3 - q1
+        occupied = bucket_value(np.flatnonzero(self.histogram))
+        inside = occupied[(occupied >= q1 - 1.5 * iqr) & (occupied <= q3 + 1.5 * iqr)]
+        lower = self.minimum if self.minimum >= q1 - 1.5 * iqr else inside.min(initial=q1)
+        upper = self.maximum if self.maximum <= q3 + 1.5 * iqr else inside.max(initial=q3)
+        return {
+            "q1": q1,
+            "median": median,
+            "q3": q3,
+            "lowerfence": float(min(lower, q1)),
+            "upperfence": float(max(upper, q3)),
+        }
+
+
+class SalaryCube:
+    """Salary sketches pre-aggregated over experience level, year, remote ratio and company size.
+
+    Any combination of the sidebar filters is answered by merging the matching
+    cells, so chart cost depends on the number of cells rather than rows.
+    Rows can be folded in batch by batch with ``update``, and the cube saved
+    and reloaded, so appended data never needs the whole file in memory.
+    """
+
+    def __init__(self, frame=None, value="salary_in_usd"):
+        self.value = value
+        self.keys = {dim: [] for dim in DIMENSIONS}
+        self.shape = (0,) * len(DIMENSIONS)
+        # Bucket counts dominate the cube's size; per-cell counts fit in int32
+        # (merging sums them as int64).
+        self.histograms = np.zeros(self.shape + (N_BUCKETS,), np.int32)
+        self.linear = np.zeros(self.shape + (N_LINEAR,), np.int32)
+        self.counts = np.zeros(self.shape, np.int64)
+        self.sums = np.zeros(self.shape)
+        self.mins = np.full(self.shape, np.inf)
+        self.maxs = np.full(self.shape, -np.inf)
+        if frame is not None:
+            self.update(frame)
+
+    def update(self, frame):
+        """Fold the rows of ``frame`` into the cube, adding cells for unseen dimension values."""
+        codes = []
+        for dim in DIMENSIONS:
+            dim_codes, uniques = pd.factorize(frame[dim], sort=True)
+            if (dim_codes < 0).any():
+                raise ValueError(f"column '{dim}' has missing values")
+            uniques = uniques.tolist()
+            if not set(uniques) <= set(self.keys[dim]):
+                self._grow(dim, uniques)
+            position = {key: i for i, key in enumerate(self.keys[dim])}
+            codes.append(np.array([position[key] for key in uniques], dtype=np.intp)[dim_codes])
+
+        n_cells = math.prod(self.shape)
+        cells = np.ravel_multi_index(codes, self.shape) if len(frame) else np.empty(0, np.intp)
+        values = frame[self.value].to_numpy(dtype=np.float64)
+        buckets = bucket_of(values)
+
+        self.histograms += np.bincount(
+            cells * N_BUCKETS + buckets, minlength=n_cells * N_BUCKETS
+        ).astype(np.int32).reshape(self.histograms.shape)
+        self.linear += np.bincount(
+            cells * N_LINEAR + linear_bin_of(values), minlength=n_cells * N_LINEAR
+        ).astype(np.int32).reshape(self.linear.shape)
+        self.counts += np.bincount(cells, minlength=n_cells).reshape(self.shape)
+        self.sums += np.bincount(cells, weights=values, minlength=n_cells).reshape(self.shape)
+        np.minimum.at(self.mins.reshape(-1), cells, values)
+        np.maximum.at(self.maxs.reshape(-1), cells, values)
+
+    def _grow(self, dim, values):
+        """Re-lay the cells so ``dim`` has a (sorted) slot for every one of ``values``."""
+        axis = DIMENSIONS.index(dim)
+        keys = sorted(set(self.keys[dim]) | set(values))
+        slots = [keys.index(key) for key in self.keys[dim]]
+        self.keys[dim] = keys
+        self.shape = tuple(len(self.keys[d]) for d in DIMENSIONS)
+        for name, fill in (("histograms", 0), ("linear", 0), ("counts", 0), ("sums", 0.0), ("mins", np.inf), ("maxs", -np.inf)):
+            old = getattr(self, name)
+            new = np.full(self.shape + old.shape[len(DIMENSIONS):], fill, dtype=old.dtype)
+            index = [slice(None)] * old.ndim
+            index[axis] = slots
+            new[tuple(index)] = old
+            setattr(self, name, new)
+
+    def save(self, file, **extra):
+        """Write the cube as ``.npz``, with ``extra`` arrays stored in the same file."""
+        np.savez(
+            file,
+            **extra,
+            keys=json.dumps([self.keys[dim] for dim in DIMENSIONS]),
+            value=self.value,
+            histograms=self.histograms,
+            linear=self.linear,
+            counts=self.counts,
+            sums=self.sums,
+            mins=self.mins,
+            maxs=self.maxs,
+        )
+
+    @classmethod
+    def load(cls, file):
+        with np.load(file) as saved:
+            cube = cls(value=str(saved["value"]))
+            cube.keys = dict(zip(DIMENSIONS, json.loads(str(saved["keys"]))))
+            for name in ("histograms", "linear", "counts", "sums", "mins", "maxs"):
+                setattr(cube, name, saved[name])
+        cube.shape = cube.counts.shape
+        return cube
+
+    def _cell_mask(self, filters):
+        mask = np.ones(self.shape, dtype=bool)
+        for axis, dim in enumerate(DIMENSIONS):
+            values = filters.get(dim)
+            if values is None:
+                continue
+            selected = np.isin(np.array(self.keys[dim], dtype=object), list(values))
+            shape = [1] * len(DIMENSIONS)
+            shape[axis] = -1
+            mask &= selected.reshape(shape)
+        return mask
+
+    def _merge(self, mask):
+        if not self.counts[mask].sum():
+            empty = np.zeros(N_BUCKETS, np.int64), np.zeros(N_LINEAR, np.int64)
+            return QuantileSketch(*empty, 0, 0.0, np.nan, np.nan)
+        return QuantileSketch(
+            self.histograms[mask].sum(axis=0),
+            self.linear[mask].sum(axis=0),
+            self.counts[mask].sum(),
+            self.sums[mask].sum(),
+            self.mins[mask].min(),
+            self.maxs[mask].max(),
+        )
+
+    def values(self, dim):
+        return list(self.keys[dim])
+
+    def count(self, filters):
+        """Number of rows matching ``{dimension: allowed values}``."""
+        return int(self.counts[self._cell_mask(filters)].sum())
+
+    def summarize(self, filters):
+        """One merged sketch for the rows matching ``{dimension: allowed values}``."""
+        return self._merge(self._cell_mask(filters))
+
+    def summarize_by(self, filters, by):
+        """Merged sketches per value of dimension ``by``, skipping empty groups."""
+        mask = self._cell_mask(filters)
+        axis = DIMENSIONS.index(by)
+        groups = {}
+        for i, value in enumerate(self.keys[by]):
+            group = np.zeros(self.shape[axis], dtype=bool)
+            group[i] = True
+            shape = [1] * len(DIMENSIONS)
+            shape[axis] = -1
+            sketch = self._merge(mask & group.reshape(shape))
+            if sketch.count:
+                groups[value] = sketch
+        return groups
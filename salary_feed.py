@@ -0,0 +1,163 @@
+import csv
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+from salary_cube import SalaryCube
+
+DATASET = "developer-salary"
+# Rows parsed per batch; memory use is bounded by this, not by the file size.
+CHUNK_ROWS = 50_000
+STATE_DIR = data_loader.CACHE_ROOT / "aggregates"
+# Bytes hashed at the start of the file and just before the processed boundary
+# to tell an appended file from a rewritten one.
+_PROBE = 4096
+
+
+class _Range(io.RawIOBase):
+    """Read-only view of an open binary file, from its current position up to ``end``."""
+
+    def __init__(self, handle, end):
+        self._handle = handle
+        self._end = end
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._end - self._handle.tell())
+        if size <= 0:
+            return 0
+        data = self._handle.read(size)
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _complete_end(handle, size):
+    """Offset just past the last newline, so a line still being appended waits for the next call."""
+    position = size
+    while position > 0:
+        step = min(_PROBE, position)
+        handle.seek(position - step)
+        newline = handle.read(step).rfind(b"\n")
+        if newline >= 0:
+            return position - step + newline + 1
+        position -= step
+    return 0
+
+
+def _continued(handle, offset, size):
+    """Whether text was appended onto a last line that was already counted without its newline."""
+    if offset == 0 or size == offset:
+        return False
+    handle.seek(offset - 1)
+    boundary = handle.read(2)
+    return boundary[:1] not in b"\r\n" and boundary[1:] not in b"\r\n"
+
+
+def _fingerprint(handle, offset):
+    digest = hashlib.sha1()
+    handle.seek(0)
+    digest.update(handle.read(min(_PROBE, offset)))
+    handle.seek(max(0, offset - _PROBE))
+    digest.update(handle.read(min(_PROBE, offset)))
+    return digest.hexdigest()
+
+
+def _state_path():
+    return STATE_DIR / f"{DATASET}.npz"
+
+
+def _read_state(path):
+    try:
+        # One open file for both reads, so the offset always matches the cube
+        # even if another process replaces the file in between.
+        with open(_state_path(), "rb") as handle:
+            with np.load(handle) as saved:
+                state = json.loads(str(saved["state"]))
+            handle.seek(0)
+            cube = SalaryCube.load(handle)
+        if state["source"] == str(path) and state["rows"] == cube.counts.sum():
+            return state, cube
+    except (OSError, ValueError, KeyError):
+        pass
+    return None, None
+
+
+def _write_state(state, cube):
+    # The offset is saved inside the cube's file, so a single replace swaps
+    # both and a reader never pairs a new cube with an old offset.
+    target = _state_path()
+    tmp = target.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as handle:
+            cube.save(handle, state=json.dumps(state))
+        os.replace(tmp, target)
+    except OSError:
+        # A read-only checkout still works, it just re-streams the file next time.
+        pass
+
+
+def update_cube(path=None, settled=False):
+    """Bring the persisted salary cube up to date with the CSV at ``path`` and return it.
+
+    Only rows appended since the last call are parsed, ``CHUNK_ROWS`` at a time,
+    and each batch is checked against the dataset schema before it is folded
+    in. The cube and the byte offset reached are saved under
+    ``.cache/aggregates/``, so a restart picks up where the last process left
+    off. A file that was rewritten rather than appended to is streamed again
+    from the start.
+
+    A last line without a trailing newline is held back only while the file
+    is still growing. It counts once the file is streamed from the start, has
+    the same size as on the previous call, or ``settled`` says it has stopped
+    changing (the watcher only reloads such files).
+    """
+    path = Path(path or data_loader.dataset_path(DATASET))
+    read_csv = data_loader.DATASETS[DATASET]["read_csv"]
+    state, cube = _read_state(path)
+
+    with open(path, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if (
+            state is None
+            or size < state["offset"]
+            or _fingerprint(handle, state["offset"]) != state["fingerprint"]
+            or _continued(handle, state["offset"], size)
+        ):
+            handle.seek(0)
+            header_line = handle.readline().decode("utf-8-sig").rstrip("\r\n")
+            header = next(csv.reader([header_line], delimiter=read_csv.get("sep", ",")), [])
+            state = {"source": str(path), "header": header, "offset": handle.tell(), "rows": 0}
+            cube = SalaryCube()
+            settled = True
+
+        end = size if settled or size == state.get("size") else _complete_end(handle, size)
+        if end > state["offset"] or size != state.get("size"):
+            if end > state["offset"]:
+                handle.seek(state["offset"])
+                batches = pd.read_csv(
+                    io.BufferedReader(_Range(handle, end)),
+                    header=None,
+                    names=state["header"],
+                    chunksize=CHUNK_ROWS,
+                    **read_csv,
+                )
+                for batch in batches:
+                    cube.update(data_loader.normalize(DATASET, batch))
+                    state["rows"] += len(batch)
+                state["offset"] = end
+            state["fingerprint"] = _fingerprint(handle, end)
+            # Saved even when a partial line was held back, so the next call can
+            # tell whether the file is still growing.
+            state["size"] = size
+            _write_state(state, cube)
+
+    return cube
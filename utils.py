@@ -1,6 +1,11 @@
 import streamlit as st
+import instrumentation
 
 def render_footer():
+    run = instrumentation.finish()
+    if run is not None and instrumentation.panel_enabled():
+        instrumentation.render_panel(run)
+
     st.markdown("---")
     st.markdown("### Keep Exploring")
 